@@ -5,7 +5,8 @@ import json
 from datetime import datetime
 from crewai_sellers_flow.adapters.braze_crm_plataform import BrazeCRMPlatform
 from crewai_sellers_flow.config import config
-from crewai_sellers_flow.domain.sellers_new_target import SELLERS_NEW_TARGET
+from crewai_sellers_flow.adapters.seller_report_writer import SellerReportWriter
+from crewai_sellers_flow.domain.status_policy import NEW_TARGET_POLICY, SELLER_POLICIES
 
 # General JSON content search
 # This approach is suitable when the JSON path is either known beforehand or can be dynamically identified.
@@ -27,14 +28,11 @@ if __name__ == "__main__":
         for seller in sellers
         if seller.seller_id >= 82354
         and seller.seller_id != 85452
-        and seller.seller_id not in SELLERS_NEW_TARGET
+        and not SELLER_POLICIES.in_cohort(seller.seller_id, NEW_TARGET_POLICY)
         and seller.have_message_to_seller()
     ]
-    json_strings = [seller.model_dump_json(indent=4) for seller in sellers]
-    combined_json = f"[{','.join(json_strings)}]"
-    # sellers = json.dumps(sellers, indent=4, ensure_ascii=False)
-    with open("resultado.json", 'w', encoding='utf-8') as f:
-        f.write(combined_json)
+    with SellerReportWriter(config.SELLERS_REPORT_PATH) as writer:
+        writer.write_all(sellers)
 
     braze_crm_platform = BrazeCRMPlatform(config.BRAZE_API_KEY)
     braze_crm_platform.update_sellers(sellers)
@@ -0,0 +1,96 @@
+"""Benchmark da agregação de fill rate por POC.
+
+Compara o laço antigo (um dict por POC e o fill rate recalculado com Decimal
+a cada registro) com o OrderAggregator colunar (`add_frame`), que é como a
+ingestão alimenta os blocos lidos do ColumnarFactStore.
+
+Uso:
+    PYTHONPATH=src python scripts/bench_aggregation.py [--sellers 34000] [--days 7] [--rows 1]
+
+O padrão é 10x o volume semanal atual (~3.400 sellers).
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+from decimal import Decimal, ROUND_UP
+
+import pandas as pd
+
+from crewai_sellers_flow.adapters.json_records import NUMERIC_FIELDS
+from crewai_sellers_flow.adapters.fill_rate_aggregation import (
+    COUNTER_COLUMNS,
+    OrderAggregator,
+)
+
+
+def legacy_aggregate(data_list: list[dict]) -> list[dict]:
+    aggregated = defaultdict(lambda: {"ID": None, **{key: 0 for key in COUNTER_COLUMNS}, "fill_rate": 0})
+    for record in data_list:
+        poc_id = record.get("dim_poc[ID]")
+        if poc_id is None:
+            continue
+        if aggregated[poc_id]["ID"] is None:
+            aggregated[poc_id]["ID"] = poc_id
+        for field, key in NUMERIC_FIELDS.items():
+            value = record.get(field, 0)
+            if isinstance(value, (int, float)):
+                aggregated[poc_id][key] += value
+        totals = aggregated[poc_id]
+        perdidos = sum(totals[key] for key in COUNTER_COLUMNS[1:])
+        rate = Decimal(totals["pedidos_gerados"] - perdidos) / Decimal(totals["pedidos_gerados"]) * 100
+        totals["fill_rate"] = float(rate.quantize(Decimal("0.1"), rounding=ROUND_UP))
+    return sorted(aggregated.values(), key=lambda x: x["ID"])
+
+
+def generate_records(sellers: int, days: int, rows: int) -> list[dict]:
+    random.seed(42)
+    records = []
+    for _ in range(days):
+        for poc_id in range(1, sellers + 1):
+            for _ in range(rows):
+                record = {field: random.randint(0, 3) for field in NUMERIC_FIELDS}
+                record["dim_poc[ID]"] = poc_id
+                record["[Pedidos_Gerados_PDV]"] = random.randint(1, 60)
+                records.append(record)
+    return records
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.3f}s")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sellers", type=int, default=34_000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--rows", type=int, default=1, help="registros por seller por dia")
+    args = parser.parse_args()
+
+    records = generate_records(args.sellers, args.days, args.rows)
+    frame = pd.DataFrame({"ID": [r["dim_poc[ID]"] for r in records]})
+    for field, key in NUMERIC_FIELDS.items():
+        frame[key] = [r[field] for r in records]
+    print(f"{len(records)} registros, {args.sellers} sellers")
+
+    legacy, legacy_time = timed("legado (dict + Decimal)", lambda: legacy_aggregate(records))
+
+    def by_frame():
+        aggregator = OrderAggregator()
+        aggregator.add_frame(frame)
+        return aggregator.result()
+
+    from_frame, frame_time = timed("colunar (add_frame)", by_frame)
+
+    keys = ["ID", *COUNTER_COLUMNS, "fill_rate"]
+    assert [{k: o[k] for k in keys} for o in from_frame] == [{k: o[k] for k in keys} for o in legacy]
+
+    print(f"speedup add_frame: {legacy_time / frame_time:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,108 @@
+import json
 import requests
 import os
+from requests.adapters import HTTPAdapter
+from crewai_sellers_flow.adapters.dispatch_scheduler import InstanceRateLimiter
+
+class _BodyStream:
+    """Corpo da requisição lido em pedaços direto das partes, sem juntá-las
+    em um novo bytes. Como tem `__len__`, o requests envia o Content-Length."""
+
+    def __init__(self, parts: tuple[bytes, ...]):
+        self._parts = [memoryview(part) for part in parts if part]
+        self._length = sum(len(part) for part in self._parts)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> memoryview | bytes:
+        if not self._parts:
+            return b""
+        part = self._parts[0]
+        if size < 0 or size >= len(part):
+            self._parts.pop(0)
+            return part
+        self._parts[0] = part[size:]
+        return part[:size]
+
+
+class PreparedImage:
+    """Corpo JSON do envio de uma imagem, com a imagem serializada uma única vez.
+
+    A cada envio só o telefone é serializado e colocado na frente do trecho
+    já pronto; os bytes resultantes são os mesmos do `json=` do requests.
+    """
+
+    PREFIX = b'{"phone": '
+
+    def __init__(self, image: str):
+        self.suffix = b', "image": ' + json.dumps(image).encode() + b"}"
+
+    def body(self, phone: str) -> _BodyStream:
+        return _BodyStream((self.PREFIX, json.dumps(phone).encode(), self.suffix))
+
 
 class ApiZMessage:
-    def __init__(self):
+    """Cliente da API Z para envio de mensagens e imagens.
+
+    Todas as chamadas usam uma única `requests.Session`, compartilhada entre
+    as threads do disparo, com um pool de até `pool_size` conexões keep-alive
+    por host: as instâncias de LKA ficam na mesma URL base, então reaproveitam
+    as mesmas conexões (sem um novo handshake TCP+TLS a cada mensagem). Com
+    `pool_block` as threads esperam uma conexão livre em vez de abrir conexões
+    extras. Toda chamada tem timeout de conexão e de leitura e, com um
+    `rate_limiter`, espera o token da instância antes de enviar.
+    """
+
+    def __init__(
+        self,
+        pool_size: int | None = None,
+        connect_timeout: float | None = None,
+        read_timeout: float | None = None,
+        rate_limiter: InstanceRateLimiter | None = None,
+    ):
         self.api_key = os.getenv("API_Z_MESSAGE_API_KEY")
         self.base_url = os.getenv("API_Z_MESSAGE_BASE_URL")
         self.headers = {
             "client-token": self.api_key
         }
+        self.pool_size = pool_size or int(os.getenv("API_Z_MESSAGE_POOL_SIZE", "15"))
+        self.timeout = (
+            connect_timeout or float(os.getenv("API_Z_MESSAGE_CONNECT_TIMEOUT", "5")),
+            read_timeout or float(os.getenv("API_Z_MESSAGE_READ_TIMEOUT", "30")),
+        )
+        self.rate_limiter = rate_limiter
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self) -> "ApiZMessage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _post(self, url: str, data: dict | _BodyStream, instance: str):
+        if self.rate_limiter:
+            self.rate_limiter.acquire(instance)
+        if isinstance(data, _BodyStream):
+            response = self.session.post(
+                url, data=data, headers={"Content-Type": "application/json"}, timeout=self.timeout
+            )
+        else:
+            response = self.session.post(url, json=data, timeout=self.timeout)
+        return response.json()
+
+    @staticmethod
+    def prepare_image(image_base64: str) -> PreparedImage:
+        """Serializa uma vez o corpo de envio de uma imagem usada em muitos envios."""
+        return PreparedImage(image_base64)
 
     def send_message(self, phone: str, message: str, instance: str, token: str):
         url = f"{self.base_url}/instances/{instance}/token/{token}/send-text"
@@ -15,14 +110,14 @@ class ApiZMessage:
             "phone": phone,
             "message": message
         }
-        response = requests.post(url, headers=self.headers, json=data)
-        return response.json()
+        return self._post(url, data, instance)
     
-    def send_image(self, phone: str, image_base64: str, instance: str, token: str):
+    def send_image(self, phone: str, image_base64: str | PreparedImage, instance: str, token: str):
         url = f"{self.base_url}/instances/{instance}/token/{token}/send-image"
+        if isinstance(image_base64, PreparedImage):
+            return self._post(url, image_base64.body(phone), instance)
         data = {
             "phone": phone,
             "image": image_base64,
         }
-        response = requests.post(url, headers=self.headers, json=data)
-        return response.json()
+        return self._post(url, data, instance)
@@ -0,0 +1,33 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+@contextmanager
+def atomic_path(path: str | Path) -> Iterator[str]:
+    """Caminho temporário, no mesmo diretório de `path`, para gravar um arquivo.
+
+    Se o bloco termina sem erro, o temporário substitui `path` de uma vez
+    (`os.replace`): quem lê o arquivo nunca vê uma gravação pela metade. Em
+    caso de erro o temporário é apagado.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    os.close(fd)
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def atomic_write_bytes(path: str | Path, content: bytes) -> None:
+    """Grava `content` em `path` de forma atômica."""
+    with atomic_path(path) as temp_path:
+        with open(temp_path, "wb") as file:
+            file.write(content)
@@ -21,9 +21,10 @@ class BrazeCRMPlatform(CRMPlatform):
             
             for report in batch:
                 if report.have_message_to_seller():
+                    offender = report.offender()
                     attribute = {
                         "external_id": str(report.seller_id),
-                        "FILL_RATE_OFENDOR": report.offender().value if report.offender() else None,
+                        "FILL_RATE_OFENDOR": offender.value if offender else None,
                         "FILL_RATE_INDEX": str(report.fill_rate),
                         "FILL_RATE_STATUS": report.status.value,
                         "FILL_RATE_MESSAGE": report.message,
@@ -0,0 +1,181 @@
+import os
+import shutil
+from collections import Counter
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from crewai_sellers_flow.adapters.atomic_file import atomic_path
+from crewai_sellers_flow.adapters.json_records import (
+    COURRIER_RECORD,
+    FILL_RATE_RECORD,
+    NUMERIC_FIELDS,
+    REASON_RECORD,
+    RecordSchema,
+    iter_json_array,
+)
+from crewai_sellers_flow.adapters.fill_rate_aggregation import (
+    CourrierAggregator,
+    OrderAggregator,
+    ReasonAggregator,
+)
+
+
+FILL_RATE_SCHEMA = pa.schema(
+    [("ID", pa.int64())] + [(key, pa.int64()) for key in NUMERIC_FIELDS.values()]
+)
+
+REASONS_SCHEMA = pa.schema([
+    ("ID", pa.int64()),
+    ("tipo", pa.string()),
+    ("motivo", pa.string()),
+    ("data", pa.string()),
+    ("hora", pa.int64()),
+    ("quantidade", pa.int64()),
+])
+
+COURRIER_SCHEMA = pa.schema([
+    ("ID", pa.int64()),
+    ("email", pa.string()),
+    ("quantidade", pa.int64()),
+])
+
+
+class ColumnarFactStore:
+    """Guarda os arquivos diários do SharePoint em formato colunar (Arrow IPC).
+
+    Na primeira leitura o JSON é convertido, em streaming, para um arquivo
+    Arrow tipado e sem compressão, com nomes de coluna limpos (`ID`,
+    `pedidos_gerados`, `tipo`...). As leituras seguintes mapeiam o arquivo em
+    memória e carregam apenas as colunas pedidas, sem cópia. Os arquivos podem
+    ser abertos fora do pipeline com `pyarrow` ou `pandas.read_feather`.
+
+    O arquivo Arrow guarda o tamanho e a data de modificação do JSON de
+    origem e a versão do formato, e é refeito quando algum deles muda. Os
+    arquivos ficam em um diretório por versão; `evict` apaga os de versões
+    anteriores e, como o SharePointFileCache, remove os usados há mais tempo
+    quando o total passa de `max_bytes`.
+    """
+
+    # Incrementar quando o formato dos arquivos mudar, para invalidar os antigos
+    VERSION = 1
+
+    # Formato de cada arquivo diário: schema Arrow e decodificador dos registros JSON
+    FORMATS: dict[str, tuple[pa.Schema, RecordSchema]] = {
+        '_fill_rate_data': (FILL_RATE_SCHEMA, FILL_RATE_RECORD),
+        '_reasons_fill_rate_data': (REASONS_SCHEMA, REASON_RECORD),
+        '_fill_rate_motoca': (COURRIER_SCHEMA, COURRIER_RECORD),
+    }
+
+    def __init__(self, base_dir: str | None = None, batch_size: int = 65_536, max_bytes: int | None = None):
+        self.root_dir = Path(base_dir or os.getenv("SELLERS_COLUMNAR_DIR", "/tmp/crewai_sellers_flow_columnar"))
+        self.base_dir = self.root_dir / f"v{self.VERSION}"
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes or int(os.getenv("SELLERS_COLUMNAR_MAX_BYTES", str(2 * 1024**3)))
+
+    def path_for(self, json_path: str) -> Path:
+        return self.base_dir / f"{Path(json_path).stem}.arrow"
+
+    def iter_batches(self, json_path: str, sufix: str, columns: list[str] | None = None) -> Iterator[pa.RecordBatch]:
+        """Lê o arquivo diário em blocos, convertendo-o na primeira vez."""
+        reader = ipc.open_file(pa.memory_map(str(self._ensure_converted(json_path, sufix))))
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            yield batch.select(columns) if columns else batch
+
+    def read_table(self, json_path: str, sufix: str, columns: list[str] | None = None) -> pa.Table:
+        """Lê o arquivo diário inteiro, convertendo-o na primeira vez."""
+        table = ipc.open_file(pa.memory_map(str(self._ensure_converted(json_path, sufix)))).read_all()
+        return table.select(columns) if columns else table
+
+    def _source_metadata(self, json_path: str) -> dict[bytes, bytes]:
+        stat = os.stat(json_path)
+        return {
+            b"format_version": str(self.VERSION).encode(),
+            b"source_size": str(stat.st_size).encode(),
+            b"source_mtime_ns": str(stat.st_mtime_ns).encode(),
+        }
+
+    def _ensure_converted(self, json_path: str, sufix: str) -> Path:
+        path = self.path_for(json_path)
+        metadata = self._source_metadata(json_path)
+        try:
+            schema = ipc.open_file(pa.memory_map(str(path))).schema
+            if schema.metadata and all(schema.metadata.get(k) == v for k, v in metadata.items()):
+                # O último uso fica na data de modificação (ordem da política LRU)
+                os.utime(path)
+                return path
+        except (FileNotFoundError, pa.ArrowInvalid):
+            pass
+
+        self._convert(json_path, sufix, path, metadata)
+        return path
+
+    def _convert(self, json_path: str, sufix: str, path: Path, metadata: dict[bytes, bytes]) -> None:
+        schema, record_schema = self.FORMATS[sufix]
+        schema = schema.with_metadata(metadata)
+
+        rejected = Counter()
+        with atomic_path(path) as temp_path, ipc.new_file(temp_path, schema) as writer:
+            rows = []
+            for record in record_schema.decode_all(iter_json_array(json_path), rejected):
+                rows.append(record)
+                if len(rows) >= self.batch_size:
+                    writer.write_batch(self._to_batch(rows, schema))
+                    rows = []
+            if rows:
+                writer.write_batch(self._to_batch(rows, schema))
+
+        if rejected:
+            print(f"{rejected.total()} registros ignorados em {json_path}: {dict(rejected)}")
+
+    def evict(self) -> None:
+        """Apaga os arquivos de versões anteriores do formato e remove os
+        usados há mais tempo até caber em `max_bytes`."""
+        for version_dir in self.root_dir.glob("v*"):
+            if version_dir != self.base_dir and version_dir.is_dir():
+                shutil.rmtree(version_dir, ignore_errors=True)
+
+        entries = []
+        total = 0
+        for path in self.base_dir.glob("*.arrow"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _to_batch(self, rows: list[tuple], schema: pa.Schema) -> pa.RecordBatch:
+        columns = list(zip(*rows))
+        arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+# Agregador de cada tabela parcial
+AGGREGATORS = {"orders": OrderAggregator, "reasons": ReasonAggregator, "courriers": CourrierAggregator}
+
+
+def aggregate_file(fact_store: ColumnarFactStore, table: str, sufix: str, file_path: str) -> pd.DataFrame:
+    """Converte um arquivo diário para o formato colunar e retorna o seu
+    parcial agregado.
+
+    Fica neste módulo, que é leve de importar, para rodar em um pool de
+    processos iniciado com `spawn`.
+    """
+    aggregator = AGGREGATORS[table]()
+    for batch in fact_store.iter_batches(file_path, sufix):
+        aggregator.add_frame(batch.to_pandas())
+    return aggregator.to_dataframe()
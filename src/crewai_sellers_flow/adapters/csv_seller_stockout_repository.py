@@ -1,66 +1,141 @@
-import csv
+import hashlib
+import os
 from pathlib import Path
 from typing import Iterable
 
+import pandas as pd
+
+from crewai_sellers_flow.adapters.atomic_file import atomic_path
+from crewai_sellers_flow.config import config
+from crewai_sellers_flow.domain.seller_report import SellerReport
 from crewai_sellers_flow.domain.seller_stockout import SellerStockOut
 from crewai_sellers_flow.ports.seller_stockout_repository import (
     SellerStockOutRepository,
 )
 
+COLUMNS = ["id", "name", "stockout", "top_product"]
+
+_INTEGER = r"[+-]?\d+"
+
 
 class CsvSellerStockOutRepository(SellerStockOutRepository):
-    """Adapter para o repositório de stockout dos sellers."""
-    
-    def __init__(self, root_path: str | None = None) -> None:
-        self.root_path = Path(root_path or "/home/diego/git/crewai-sellers-flow")
-        self.csv_path = self.root_path / "downloads" / "STOCKOUT.csv"
+    """Adapter para o repositório de stockout dos sellers.
+
+    O CSV (separado por `;`, com cabeçalho) é lido de uma vez pelo pandas,
+    com todas as colunas como texto, e limpo de forma vetorizada. A tabela
+    limpa é guardada em Feather (e não pickle, já que o diretório pode ser
+    compartilhado) em `cache_dir`, com o caminho, o tamanho e a data de
+    modificação do CSV na chave, e reaproveitada enquanto o CSV não mudar.
+    """
+
+    def __init__(self, root_path: str | None = None, cache_dir: str | None = None) -> None:
+        if root_path:
+            self.csv_path = Path(root_path) / "downloads" / "STOCKOUT.csv"
+        else:
+            self.csv_path = Path(config.STOCKOUT_CSV_PATH)
+        self.cache_dir = Path(cache_dir or os.getenv("SELLERS_STOCKOUT_CACHE_DIR", "/tmp/crewai_sellers_flow_stockout"))
         self.sellers: list[SellerStockOut] = []
+        self._table: pd.DataFrame | None = None
+        self._by_id: dict[int, int] | None = None
 
     def read(self) -> list[SellerStockOut]:
         if not self.csv_path.exists():
             return []
 
         if not self.sellers:
-            self.sellers = self._read()
+            # Os valores já foram validados na limpeza da tabela
+            table = self._load()
+            self.sellers = [
+                SellerStockOut.model_construct(id=id, name=name, stockout=stockout, top_product=top_product)
+                for id, name, stockout, top_product in zip(*(table[column].tolist() for column in COLUMNS))
+            ]
 
         return self.sellers
 
-    def _read(self) -> list[SellerStockOut]:
-        sellers: list[SellerStockOut] = []
-        with self.csv_path.open("r", encoding="utf-8") as fp:
-            reader = csv.reader(fp, delimiter=';')
-            # Skip header
-            try:
-                next(reader)
-            except StopIteration:
-                return []
-
-            for row in reader:
-                if not row or len(row) < 4:
-                    continue
-                # Some headers include backslashes; data rows appear clean
-                try:
-                    if row[3].strip() == "#N/D":
-                        continue
-                    seller = SellerStockOut(
-                        id=int(row[0].strip()),
-                        name=row[1].strip(),
-                        stockout=int(row[2].strip().replace("#N/D", "0")) if row[2].strip() != "" else 0,
-                        top_product=row[3].strip(),
-                    )
-                except ValueError:
-                    # If stockout is not an int (e.g., '#N/D'), coerce to 0
-                    try:
-                        seller = SellerStockOut(
-                            id=int(row[0].strip()),
-                            name=row[1].strip(),
-                            stockout=0,
-                            top_product=row[3].strip(),
-                        )
-                    except Exception:
-                        continue
-                sellers.append(seller)
+    def get(self, seller_id: int) -> SellerStockOut | None:
+        position = self._index().get(seller_id)
+        if position is None:
+            return None
+        table = self._load()
+        return SellerStockOut.model_construct(
+            id=int(table["id"].iat[position]),
+            name=table["name"].iat[position],
+            stockout=int(table["stockout"].iat[position]),
+            top_product=table["top_product"].iat[position],
+        )
 
+    def join(self, sellers: Iterable[SellerReport]) -> Iterable[SellerReport]:
+        index = self._index()
+        top_products = self._load()["top_product"].tolist() if index else []
+        for seller in sellers:
+            position = index.get(seller.seller_id)
+            seller.stockout_top_product = top_products[position] if position is not None else None
         return sellers
 
+    def _index(self) -> dict[int, int]:
+        # Posição de cada ID na tabela; em IDs repetidos vale a primeira linha do CSV
+        if self._by_id is None:
+            table = self._load()
+            first = ~table["id"].duplicated()
+            ids = table["id"][first].tolist()
+            self._by_id = dict(zip(ids, first.to_numpy().nonzero()[0].tolist()))
+        return self._by_id
+
+    def _load(self) -> pd.DataFrame:
+        if self._table is None:
+            if not self.csv_path.exists():
+                self._table = pd.DataFrame({column: [] for column in COLUMNS})
+            else:
+                self._table = self._load_cached()
+        return self._table
+
+    def _cache_path(self, stat: os.stat_result) -> Path:
+        # A chave inclui o caminho, o tamanho e a data de modificação do CSV
+        key = f"{self.csv_path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+        return self.cache_dir / f"stockout-{hashlib.sha1(key.encode()).hexdigest()[:16]}.feather"
+
+    def _load_cached(self) -> pd.DataFrame:
+        path = self._cache_path(self.csv_path.stat())
+        try:
+            return pd.read_feather(path)
+        except (FileNotFoundError, OSError, ValueError):
+            pass
+
+        table = self._read()
+        with atomic_path(path) as temp_path:
+            table.to_feather(temp_path)
+        return table
+
+    def _read(self) -> pd.DataFrame:
+        raw = pd.read_csv(
+            self.csv_path,
+            sep=";",
+            header=None,
+            skiprows=1,
+            # Com os nomes fixos, linhas curtas são completadas com campos vazios
+            # (em vez de quebrar a leitura) e colunas extras são ignoradas
+            names=range(4),
+            usecols=range(4),
+            dtype=str,
+            encoding="utf-8",
+            keep_default_na=False,
+        )
+
+        # Descarta linhas sem ID numérico e sem produto: vazio, #N/D ou linha
+        # curta (o pandas não distingue um quarto campo vazio de um ausente)
+        ids = raw[0].str.strip()
+        top_products = raw[3].str.strip()
+        valid = ids.str.fullmatch(_INTEGER) & (top_products != "") & (top_products != "#N/D")
+        raw, ids, top_products = raw[valid], ids[valid], top_products[valid]
+
+        # Stockout vazio, #N/D ou não numérico conta como zero
+        stockout = raw[2].str.strip().str.replace("#N/D", "0", regex=False)
+        stockout = stockout.where(stockout.str.fullmatch(_INTEGER), "0")
+
+        return pd.DataFrame({
+            "id": ids.astype("int64"),
+            "name": raw[1].str.strip(),
+            "stockout": stockout.astype("int64"),
+            "top_product": top_products,
+        }).reset_index(drop=True)
 
@@ -0,0 +1,57 @@
+import os
+import hashlib
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from crewai_sellers_flow.adapters.atomic_file import atomic_path
+
+
+class DailyPartialStore:
+    """Armazena localmente os agregados parciais de cada dia.
+
+    Para cada dia são guardadas tabelas pequenas em Parquet, por nome:
+    - orders: os seis contadores somados por POC (coluna ID);
+    - reasons: quantidades por ID, tipo, motivo, data e hora;
+    - courriers: cancelamentos por ID e email do entregador (opcional).
+
+    Qualquer intervalo de datas pode então ser respondido somando as
+    tabelas dos dias, sem reler os arquivos JSON. Os parciais ficam em um
+    diretório por origem (`source`, como a URL da pasta do SharePoint), para
+    que repositórios de pastas diferentes não leiam os parciais um do outro.
+    """
+
+    # Incrementar quando o formato dos parciais mudar, para invalidar os antigos
+    VERSION = 1
+
+    def __init__(self, base_dir: str | None = None, source: str | None = None):
+        self.base_dir = Path(
+            base_dir or os.getenv("SELLERS_PARTIALS_DIR", "/tmp/crewai_sellers_flow_partials")
+        ) / f"v{self.VERSION}"
+        if source:
+            self.base_dir /= hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+    def _path(self, day: date, name: str) -> Path:
+        return self.base_dir / f"{day.strftime('%Y_%m_%d')}_{name}.parquet"
+
+    def load(self, day: date, names: list[str]) -> dict[str, pd.DataFrame] | None:
+        """Retorna as tabelas pedidas do dia ou None se alguma não existir."""
+        try:
+            return {name: pd.read_parquet(self._path(day, name)) for name in names}
+        except FileNotFoundError:
+            return None
+
+    def save(self, day: date, tables: dict[str, pd.DataFrame]) -> None:
+        """Grava as tabelas do dia, cada uma de forma atômica.
+
+        A tabela `orders` é gravada por último: o dia só é considerado salvo
+        quando ela existe.
+        """
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        for name in sorted(tables, key=lambda name: name == "orders"):
+            self._atomic_write(tables[name], self._path(day, name))
+
+    def _atomic_write(self, df: pd.DataFrame, path: Path) -> None:
+        with atomic_path(path) as temp_path:
+            df.to_parquet(temp_path, index=False)
@@ -0,0 +1,133 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+
+class TokenBucket:
+    """Balde de tokens: até `capacity` envios seguidos e, depois disso,
+    `rate` envios por segundo. Pode ser usado por várias threads."""
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError(f"A taxa do balde de tokens deve ser positiva: {rate}")
+        # Com capacidade menor que 1 nenhum token chega a ser consumido e o acquire nunca retorna
+        if capacity < 1:
+            raise ValueError(f"A capacidade do balde de tokens deve ser ao menos 1: {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Espera até haver um token e o consome."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class InstanceRateLimiter:
+    """Um TokenBucket por instância da API Z, criado no primeiro uso.
+
+    Limita os envios de cada número de LKA sem que uma instância ocupada
+    atrase as outras.
+    """
+
+    def __init__(self, rate: float | None = None, capacity: float | None = None):
+        self.rate = rate or float(os.getenv("WHATSAPP_INSTANCE_RATE", "2"))
+        self.capacity = capacity or float(os.getenv("WHATSAPP_INSTANCE_BURST", "4"))
+        # Valida a configuração já na criação, e não no primeiro envio
+        TokenBucket(self.rate, self.capacity)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, instance: str) -> TokenBucket:
+        with self._lock:
+            if instance not in self._buckets:
+                self._buckets[instance] = TokenBucket(self.rate, self.capacity)
+            return self._buckets[instance]
+
+    def acquire(self, instance: str) -> None:
+        self.bucket(instance).acquire()
+
+
+class DispatchScheduler:
+    """Executa as tarefas de disparo em uma fila por instância da API Z.
+
+    Cada instância tem a sua fila e `workers_per_instance` threads, criadas
+    quando chega a primeira tarefa dela, então as instâncias andam em paralelo
+    e o total de threads cresce com o número de instâncias usadas, não com um
+    número global fixo. O ritmo de cada instância é dado pelo
+    InstanceRateLimiter usado pelo ApiZMessage. Uma tarefa (por exemplo, a
+    imagem e depois o texto de um vendedor) roda inteira na mesma thread, na
+    ordem em que foi escrita.
+
+    A interface segue a do ThreadPoolExecutor: `submit` devolve um Future e
+    o bloco `with` espera todas as tarefas terminarem.
+    """
+
+    _STOP = object()
+
+    def __init__(self, workers_per_instance: int | None = None):
+        self.workers_per_instance = workers_per_instance or int(os.getenv("WHATSAPP_WORKERS_PER_INSTANCE", "2"))
+        self._queues: dict[str, queue.SimpleQueue] = {}
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "DispatchScheduler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def submit(self, instance: str, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        future = Future()
+        self._queue(instance).put((future, fn, args, kwargs))
+        return future
+
+    def _queue(self, instance: str) -> queue.SimpleQueue:
+        with self._lock:
+            if instance not in self._queues:
+                tasks = queue.SimpleQueue()
+                self._queues[instance] = tasks
+                for number in range(self.workers_per_instance):
+                    thread = threading.Thread(
+                        target=self._work, args=(tasks,), name=f"dispatch-{instance[:8]}-{number}", daemon=True
+                    )
+                    thread.start()
+                    self._threads.append(thread)
+            return self._queues[instance]
+
+    def _work(self, tasks: queue.SimpleQueue) -> None:
+        while True:
+            task = tasks.get()
+            if task is self._STOP:
+                return
+            future, fn, args, kwargs = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self) -> None:
+        """Espera as tarefas já enviadas terminarem e encerra as threads."""
+        with self._lock:
+            for tasks in self._queues.values():
+                for _ in range(self.workers_per_instance):
+                    tasks.put(self._STOP)
+            threads, self._threads = self._threads, []
+            self._queues = {}
+        for thread in threads:
+            thread.join()
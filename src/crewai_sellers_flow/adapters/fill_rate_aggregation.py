@@ -0,0 +1,323 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from crewai_sellers_flow.adapters.json_records import NUMERIC_FIELDS
+
+COUNTER_COLUMNS = list(NUMERIC_FIELDS.values())
+
+REASON_COLUMNS = ["ID", "tipo", "motivo", "data", "hora", "quantidade"]
+
+COURRIER_COLUMNS = ["ID", "email", "quantidade"]
+
+
+def fill_rate_column(totals: pd.DataFrame) -> np.ndarray:
+    """Calcula o fill rate de todos os POCs de uma vez.
+
+    Mesma semântica do cálculo com `Decimal`: percentual de pedidos não
+    cancelados arredondado para 0.1 com ROUND_UP (afastando de zero). A conta
+    é feita em inteiros para não depender de arredondamento de ponto
+    flutuante. POCs sem pedidos gerados ficam com fill rate 0.
+    """
+    gerados = totals['pedidos_gerados'].to_numpy().astype(np.int64)
+    perdidos = totals[COUNTER_COLUMNS[1:]].to_numpy().sum(axis=1).astype(np.int64)
+    numerator = (gerados - perdidos) * 1000
+    safe = np.where(gerados == 0, 1, gerados)
+    # Divisão inteira arredondando para longe de zero
+    tenths = np.sign(numerator) * (-(-np.abs(numerator) // safe))
+    return np.where(gerados == 0, 0.0, tenths / 10)
+
+
+class OrderAggregator:
+    """Agrega os registros de pedidos por ID, bloco a bloco.
+
+    Cada bloco é somado por POC com um group-by do pandas. Apenas os totais
+    de cada POC ficam em memória, então o consumo depende do número de
+    sellers e não do número de registros. O fill rate é calculado uma única
+    vez, no final.
+    """
+
+    def __init__(self):
+        self._totals: pd.DataFrame | None = None
+
+    def add_frame(self, frame: pd.DataFrame) -> None:
+        """Soma um bloco já em formato de colunas (ID e os seis contadores)."""
+        totals = frame.groupby('ID', sort=False)[COUNTER_COLUMNS].sum()
+        self._totals = totals if self._totals is None else self._totals.add(totals, fill_value=0)
+
+    def totals(self) -> pd.DataFrame:
+        """Retorna os contadores somados por POC, indexados pelo ID."""
+        if self._totals is None:
+            return pd.DataFrame(columns=COUNTER_COLUMNS, index=pd.Index([], name='ID'))
+        return self._totals.sort_index()
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Retorna os contadores somados por POC, com o ID como coluna."""
+        return self.totals().reset_index()
+
+    def result(self) -> list[dict]:
+        """Retorna os totais por POC com o fill rate calculado."""
+        totals = self.totals()
+        if totals.empty:
+            return []
+        # A soma com fill_value gera float; volta para inteiro quando possível
+        if all(np.all(np.mod(totals[key].to_numpy(), 1) == 0) for key in COUNTER_COLUMNS):
+            totals = totals.astype(np.int64)
+        totals = totals.assign(fill_rate=fill_rate_column(totals)).reset_index()
+
+        orders = totals.to_dict('records')
+        for order in orders:
+            order['motocas'] = []
+            order['motivos'] = []
+        return orders
+
+
+class _Dictionary:
+    """Codifica os valores de uma coluna em inteiros pequenos, na ordem em que aparecem."""
+
+    def __init__(self, name: str, bits: int):
+        self.name = name
+        self.limit = 1 << bits
+        self.codes: dict = {}
+        self.values: list = []
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            if len(self.values) >= self.limit:
+                raise ValueError(f"Mais de {self.limit} valores distintos para {self.name}")
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        # O dtype é inferido a partir dos valores distintos, como seria na coluna inteira
+        return pd.Series(self.values).to_numpy()[codes]
+
+
+class ReasonAggregator:
+    """Soma as quantidades de motivos de cancelamento por ID, tipo, motivo,
+    data e hora, bloco a bloco.
+
+    Cada campo é codificado em um inteiro pequeno e os cinco códigos são
+    empacotados em uma única chave int64. Cada bloco é reduzido, junto com o
+    acumulado, para uma linha por chave. O DataFrame só é montado no final.
+    """
+
+    # Bits de cada campo na chave empacotada: (nome, bits), do menos para o
+    # mais significativo. Total de 63 bits para caber em um int64 positivo.
+    _LAYOUT = [("hora", 6), ("data", 10), ("motivo", 10), ("tipo", 6), ("ID", 31)]
+
+    def __init__(self):
+        self._dictionaries = {name: _Dictionary(name, bits) for name, bits in self._LAYOUT}
+        self._shifts = {}
+        shift = 0
+        for name, bits in self._LAYOUT:
+            self._shifts[name] = shift
+            shift += bits
+        self._merged_keys = np.empty(0, dtype=np.int64)
+        self._merged_quantities = np.empty(0, dtype=np.int64)
+
+    def add_frame(self, frame: pd.DataFrame) -> None:
+        """Soma um bloco já em formato de colunas (ID, tipo, motivo, data, hora e quantidade)."""
+        if frame.empty:
+            return
+        keys = np.zeros(len(frame), dtype=np.int64)
+        for name, _ in self._LAYOUT:
+            local_codes, uniques = pd.factorize(frame[name], use_na_sentinel=False)
+            dictionary = self._dictionaries[name]
+            codes = np.array([dictionary.encode(value) for value in uniques], dtype=np.int64)
+            keys |= codes[local_codes] << self._shifts[name]
+        self._reduce(keys, frame["quantidade"].to_numpy(dtype=np.int64))
+
+    def _reduce(self, keys: np.ndarray, quantities: np.ndarray) -> None:
+        keys = np.concatenate([self._merged_keys, keys])
+        quantities = np.concatenate([self._merged_quantities, quantities])
+
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        self._merged_keys = keys[starts]
+        self._merged_quantities = np.add.reduceat(quantities[order], starts)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Retorna as quantidades agregadas ordenadas por ID, tipo, motivo, data e hora."""
+        if len(self._merged_keys) == 0:
+            return pd.DataFrame(columns=REASON_COLUMNS)
+
+        columns = {}
+        for name, bits in reversed(self._LAYOUT):
+            codes = (self._merged_keys >> self._shifts[name]) & ((1 << bits) - 1)
+            columns[name] = self._dictionaries[name].decode(codes)
+        columns["quantidade"] = self._merged_quantities
+
+        df = pd.DataFrame(columns, columns=REASON_COLUMNS)
+        return df.sort_values(['ID', 'tipo', 'motivo', 'data', 'hora'])
+
+
+def rank_reasons(reasons: pd.DataFrame) -> dict[object, list[dict]]:
+    """Ranqueia os motivos de cancelamento de todos os sellers de uma vez.
+
+    Para cada ID escolhe o tipo com maior quantidade, depois o motivo com
+    maior quantidade dentro desse tipo, e devolve os horários (data e hora)
+    desse motivo ordenados pela quantidade, do maior para o menor.
+
+    Returns:
+        dict: Lista de motivos (tipo, motivo, data, hora, quantidade) por ID
+    """
+    if reasons.empty:
+        return {}
+    return _group_by_id(_rank_slots(reasons))
+
+
+def rank_reasons_bounded(reasons: pd.DataFrame, top_k: int) -> tuple[dict[object, list[dict]], dict[object, dict]]:
+    """Como `rank_reasons`, mas guarda no máximo os `top_k` primeiros horários
+    de cada ID, além de todos os empatados com a maior quantidade (usados
+    nas mensagens), e um resumo de todos os horários.
+
+    Returns:
+        tuple: Motivos por ID e resumo por ID (total, slots, max_quantity e
+        ties_at_max: horários empatados com a maior quantidade)
+    """
+    if reasons.empty:
+        return {}, {}
+
+    data_hora = _rank_slots(reasons)
+    by_id = data_hora.groupby('ID', sort=False)['quantidade']
+    max_quantity = by_id.transform('max')
+    at_max = data_hora['quantidade'] == max_quantity
+
+    summary = pd.DataFrame({
+        'total': by_id.sum(),
+        'slots': by_id.size(),
+        'max_quantity': by_id.max(),
+        'ties_at_max': at_max.groupby(data_hora['ID'], sort=False).sum(),
+    })
+    summaries = {
+        id_record: {key: int(value) for key, value in row.items()}
+        for id_record, row in zip(summary.index.tolist(), summary.to_dict('records'))
+    }
+
+    keep = (by_id.cumcount() < top_k) | at_max
+    return _group_by_id(data_hora[keep.to_numpy()]), summaries
+
+
+def _rank_slots(reasons: pd.DataFrame) -> pd.DataFrame:
+    """Horários do motivo dominante de cada ID, ordenados por quantidade."""
+    # Tipo dominante de cada ID
+    tipos = reasons.groupby(['ID', 'tipo'])['quantidade'].sum().reset_index()
+    tipos = tipos.loc[tipos.groupby('ID')['quantidade'].idxmax(), ['ID', 'tipo']]
+    selected = reasons.merge(tipos, on=['ID', 'tipo'])
+
+    # Motivo dominante dentro do tipo
+    motivos = selected.groupby(['ID', 'motivo'])['quantidade'].sum().reset_index()
+    motivos = motivos.loc[motivos.groupby('ID')['quantidade'].idxmax(), ['ID', 'motivo']]
+    selected = selected.merge(motivos, on=['ID', 'motivo'])
+
+    data_hora = selected.groupby(['ID', 'tipo', 'motivo', 'data', 'hora'])['quantidade'].sum().reset_index()
+    return data_hora.iloc[_sort_quantity_desc_by_id(data_hora)]
+
+
+def _group_by_id(data_hora: pd.DataFrame) -> dict[object, list[dict]]:
+    ranked: dict[object, list[dict]] = {}
+    ids = data_hora['ID'].tolist()
+    records = data_hora.drop(columns='ID').to_dict('records')
+    for id_record, record in zip(ids, records):
+        ranked.setdefault(id_record, []).append(record)
+    return ranked
+
+
+def _sort_quantity_desc_by_id(data_hora: pd.DataFrame) -> np.ndarray:
+    """Ordena cada ID por quantidade decrescente, mantendo os IDs agrupados.
+
+    Reproduz `sort_values('quantidade', ascending=False)` aplicado a cada ID
+    separadamente (mesmo algoritmo, quicksort), para que a ordem dos empates
+    seja a mesma do ranking feito seller a seller.
+    """
+    ids = data_hora['ID'].to_numpy()
+    quantities = data_hora['quantidade'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)]
+
+    order = np.empty(len(ids), dtype=np.intp)
+    for start, end in zip(starts, ends):
+        group = quantities[start:end][::-1]
+        positions = np.arange(end - start)[::-1][group.argsort(kind='quicksort')][::-1]
+        order[start:end] = start + positions
+    return order
+
+
+def merge_reasons(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Soma tabelas de motivos (por exemplo, os parciais de cada dia) em uma só."""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=REASON_COLUMNS)
+
+    keys = REASON_COLUMNS[:-1]
+    if len(frames) == 1:
+        merged = frames[0]
+    else:
+        merged = pd.concat(frames, ignore_index=True)
+        merged = merged.groupby(keys, sort=False, dropna=False)['quantidade'].sum().reset_index()
+    return merged.sort_values(keys)
+
+
+class CourrierAggregator:
+    """Soma os cancelamentos feitos por cada entregador (email) em cada POC."""
+
+    def __init__(self):
+        self._totals: pd.Series | None = None
+
+    def add_frame(self, frame: pd.DataFrame) -> None:
+        """Soma um bloco em formato de colunas (ID, email e quantidade)."""
+        totals = frame.groupby(['ID', 'email'], sort=False)['quantidade'].sum()
+        self._totals = totals if self._totals is None else self._totals.add(totals, fill_value=0)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Retorna as quantidades por ID e email, ordenadas por ID e email."""
+        if self._totals is None:
+            return pd.DataFrame(columns=COURRIER_COLUMNS)
+        return self._totals.astype(np.int64).sort_index().reset_index()
+
+
+def merge_courriers(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Soma tabelas de entregadores (por exemplo, os parciais de cada dia) em uma só."""
+    aggregator = CourrierAggregator()
+    for frame in frames:
+        if not frame.empty:
+            aggregator.add_frame(frame)
+    return aggregator.to_dataframe()
+
+
+def top_courriers(courriers: pd.DataFrame, k: int = 2) -> dict[object, list[dict]]:
+    """Seleciona, em uma única passada, os `k` entregadores com mais
+    cancelamentos de cada POC.
+
+    Cada POC mantém um heap limitado a `k` entradas, então o custo é linear no
+    número de linhas. Empates ficam com o primeiro email em ordem alfabética,
+    como no `nlargest` sobre a tabela ordenada por ID e email.
+
+    Returns:
+        dict: Lista de entregadores (email, quantidade) por ID, do maior para o menor
+    """
+    heaps: dict[object, list] = {}
+    ids = courriers['ID'].tolist()
+    emails = courriers['email'].tolist()
+    quantities = courriers['quantidade'].tolist()
+    for position, (id_record, email, quantity) in enumerate(zip(ids, emails, quantities)):
+        heap = heaps.setdefault(id_record, [])
+        # -position: entre quantidades iguais, a linha que veio antes é a maior
+        item = (quantity, -position, email)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    return {
+        id_record: [
+            {"email": email, "quantidade": quantity}
+            for quantity, _, email in sorted(heap, reverse=True)
+        ]
+        for id_record, heap in heaps.items()
+    }
@@ -0,0 +1,229 @@
+import json
+from collections import Counter
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_json_array(path: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Lê um arquivo contendo um array JSON e devolve um elemento por vez.
+
+    O arquivo é lido em blocos de `chunk_size` caracteres e apenas o elemento
+    sendo decodificado fica em memória, então o consumo não cresce com o
+    número de registros do arquivo. Aceita só o que o `json.load` aceitaria:
+    arquivo vazio ou sem `[`, vírgula ausente ou repetida, array sem o `]`
+    final ou conteúdo depois dele geram ValueError (depois dos elementos já
+    devolvidos).
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as file:
+        buffer = ""
+        pos = 0
+        eof = False
+        # start: antes do `[`; first: logo após o `[`; value: após uma vírgula;
+        # next: após um elemento; end: após o `]`
+        state = "start"
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+
+            if pos >= len(buffer):
+                if eof:
+                    if state == "start":
+                        raise ValueError(f"O arquivo {path} não contém um array JSON")
+                    if state != "end":
+                        raise ValueError(f"Array JSON incompleto em {path}")
+                    return
+                buffer = file.read(chunk_size)
+                pos = 0
+                eof = buffer == ""
+                continue
+
+            char = buffer[pos]
+            if state == "start":
+                if char != "[":
+                    raise ValueError(f"O arquivo {path} não contém um array JSON")
+                state = "first"
+                pos += 1
+                continue
+            if state == "end":
+                raise ValueError(f"Conteúdo após o fim do array JSON em {path}")
+            if state == "next":
+                if char not in ",]":
+                    raise ValueError(f"Vírgula ausente entre elementos do array JSON em {path}")
+                state = "value" if char == "," else "end"
+                pos += 1
+                continue
+            if char == "]" and state == "first":
+                state = "end"
+                pos += 1
+                continue
+            if char in ",]":
+                raise ValueError(f"Elemento ausente no array JSON em {path}")
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                item, end = None, None
+
+            # Sem o fim do elemento no buffer (ou um número que pode continuar
+            # no próximo bloco): lê mais e tenta de novo
+            if end is None or (not eof and (end == len(buffer) or buffer[end] not in _DELIMITERS)):
+                if eof:
+                    raise ValueError(f"Elemento JSON inválido em {path}")
+                chunk = file.read(chunk_size)
+                eof = chunk == ""
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            yield item
+            pos = end
+            state = "next"
+
+
+# Campos numéricos do arquivo de fill rate e o nome do campo tipado correspondente
+NUMERIC_FIELDS = {
+    "[Pedidos_Gerados_PDV]": "pedidos_gerados",
+    "[Cancelado_Entregador_PDV]": "cancelado_entregador",
+    "[Cancelado_PDV_PDV]": "cancelado_pdv",
+    "[Cancelado_Usuário_PDV]": "cancelado_usuario",
+    "[Pedidos_Rejeitados_PDV]": "pedidos_rejeitados",
+    "[Pedidos_Expirados_PDV]": "pedidos_expirados",
+}
+
+
+class FillRateRecord(NamedTuple):
+    ID: int
+    pedidos_gerados: int
+    cancelado_entregador: int
+    cancelado_pdv: int
+    cancelado_usuario: int
+    pedidos_rejeitados: int
+    pedidos_expirados: int
+
+
+class ReasonRecord(NamedTuple):
+    ID: int
+    tipo: str | None
+    motivo: str | None
+    data: str | None
+    hora: int | None
+    quantidade: int
+
+
+class CourrierRecord(NamedTuple):
+    ID: int
+    email: str
+    quantidade: int
+
+
+def _count(value) -> int:
+    # Contadores que não são números (texto, etc.) contam como zero; um
+    # contador fracionário (2.7) invalida o registro em vez de ser truncado
+    if type(value) is int:
+        return value
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"Contador não inteiro: {value}")
+        return int(value)
+    return int(value) if isinstance(value, int) else 0
+
+
+def _optional_int(value) -> int | None:
+    return None if value is None else int(value)
+
+
+def _text(value) -> str | None:
+    return value if value is None or type(value) is str else str(value)
+
+
+class Field(NamedTuple):
+    source: str
+    decode: Callable[[Any], Any]
+    default: Any = None
+    required: bool = False
+
+
+class RecordSchema:
+    """Decodificador de schema fixo para um tipo de registro do export.
+
+    Mapeia, uma única vez, as colunas do export (com colchetes, como
+    `[Pedidos_Gerados_PDV]`) para os campos de um NamedTuple tipado. Cada
+    registro é lido com um único `itemgetter` e convertido campo a campo;
+    registros inválidos são descartados e contados em `rejected`, por motivo.
+    """
+
+    def __init__(self, record_type: type, fields: list[Field]):
+        self.record_type = record_type
+        self.fields = fields
+        self._getter = itemgetter(*(field.source for field in fields))
+        self._decoders = tuple(field.decode for field in fields)
+
+    def decode(self, raw: Any, rejected: Counter) -> tuple | None:
+        try:
+            values = self._getter(raw)
+        except KeyError:
+            values = tuple(raw.get(field.source, field.default) for field in self.fields)
+        except TypeError:
+            rejected["registro não é um objeto"] += 1
+            return None
+
+        # Caminho rápido: registro completo e bem formado
+        if None not in values:
+            try:
+                return self.record_type._make([decode(value) for decode, value in zip(self._decoders, values)])
+            except (TypeError, ValueError):
+                pass
+
+        decoded = []
+        for field, value in zip(self.fields, values):
+            if value is None:
+                if field.required:
+                    rejected[f"{field.source} ausente"] += 1
+                    return None
+                value = field.default
+            try:
+                decoded.append(field.decode(value))
+            except (TypeError, ValueError):
+                rejected[f"{field.source} inválido"] += 1
+                return None
+        return self.record_type._make(decoded)
+
+    def decode_all(self, records: Iterable[Any], rejected: Counter | None = None) -> Iterator[tuple]:
+        rejected = Counter() if rejected is None else rejected
+        for raw in records:
+            record = self.decode(raw, rejected)
+            if record is not None:
+                yield record
+
+
+FILL_RATE_RECORD = RecordSchema(
+    FillRateRecord,
+    [Field('dim_poc[ID]', int, required=True)]
+    + [Field(source, _count, 0) for source in NUMERIC_FIELDS],
+)
+
+REASON_RECORD = RecordSchema(
+    ReasonRecord,
+    [
+        Field("[ID]", int, required=True),
+        Field("[Tipo]", _text),
+        Field("[Motivo]", _text),
+        Field("[Data]", _text),
+        Field("[Hora]", _optional_int),
+        Field("[Quantity]", _count, 0),
+    ],
+)
+
+COURRIER_RECORD = RecordSchema(
+    CourrierRecord,
+    [
+        Field("dim_poc[ID]", int, required=True),
+        Field("fact_fill_rate_pdvs[deliveryman_email]", _text, "N/A"),
+        Field("[Canc_motoca]", _count, 0),
+    ],
+)
@@ -1,27 +1,73 @@
 import os
-import json
-import re
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Any
-from collections import defaultdict
+from typing import List, Iterator
 import pandas as pd
-from decimal import Decimal, ROUND_UP
-from crewai_sellers_flow.domain.seller_report import SellerReport, ReasonCancel, CourrierCancel
+from urllib.parse import quote, unquote
+from crewai_sellers_flow.domain.seller_report import SellerReport, ReasonCancel, ReasonsSummary, CourrierCancel
+from crewai_sellers_flow.domain.seller_report_batch import SellerReportBatch
+from crewai_sellers_flow.domain.message_renderer import Channel, render_messages
 
 from office365.sharepoint.client_context import ClientContext
 from office365.runtime.auth.client_credential import ClientCredential
+from office365.sharepoint.files.file import File
+from office365.runtime.http.request_options import RequestOptions
 from crewai_sellers_flow.ports.seller_repository import SellerRepository
+from crewai_sellers_flow.adapters.sharepoint_file_cache import SharePointFileCache
+from crewai_sellers_flow.adapters.fill_rate_aggregation import (
+    OrderAggregator,
+    merge_courriers,
+    merge_reasons,
+    rank_reasons,
+    rank_reasons_bounded,
+    top_courriers,
+)
+from crewai_sellers_flow.adapters.daily_partial_store import DailyPartialStore
+from crewai_sellers_flow.adapters.columnar_fact_store import ColumnarFactStore, aggregate_file
 
 class DownloadError(Exception):
     pass
 
 class JsonSellerRepository(SellerRepository):
 
-    def __init__(self):
+    FILL_RATE_SUFIX = '_fill_rate_data'
+    REASONS_SUFIX = '_reasons_fill_rate_data'
+    COURRIER_SUFIX = '_fill_rate_motoca'
+
+    def __init__(
+        self,
+        max_downloads: int | None = None,
+        cache: SharePointFileCache | None = None,
+        partial_store: DailyPartialStore | None = None,
+        fact_store: ColumnarFactStore | None = None,
+        include_courriers: bool | None = None,
+        courrier_top_k: int = 2,
+        ingest_workers: int | None = None,
+        reasons_top_k: int | None = None,
+    ):
         self.site_url = os.getenv("SHAREPOINT_SITE_URL")
         self.client_id = os.getenv("SHAREPOINT_CLIENT_ID")
         self.client_secret = os.getenv("SHAREPOINT_CLIENT_SEC")
         self.folder_path = os.getenv("SHAREPOINT_PATH")
+        # Quantidade máxima de downloads simultâneos (1 = modo serial)
+        self.max_downloads = max_downloads or int(os.getenv("SHAREPOINT_MAX_DOWNLOADS", "8"))
+        self.cache = cache or SharePointFileCache()
+        # Dias mais recentes que isso ainda podem mudar e são sempre revalidados
+        self.cache_revalidate_days = int(os.getenv("SHAREPOINT_CACHE_REVALIDATE_DAYS", "1"))
+        self.partial_store = partial_store or DailyPartialStore(source=f"{self.site_url}|{self.folder_path}")
+        self.fact_store = fact_store or ColumnarFactStore()
+        # Etapa opcional: entregadores que mais cancelaram em cada POC
+        if include_courriers is None:
+            include_courriers = os.getenv("SELLERS_INCLUDE_COURRIERS", "false").lower() in ("1", "true")
+        self.include_courriers = include_courriers
+        self.courrier_top_k = courrier_top_k
+        # Processos usados na agregação dos arquivos diários (1 = modo serial)
+        self.ingest_workers = ingest_workers or int(os.getenv("SELLERS_INGEST_WORKERS", "1"))
+        # Horários de motivos guardados por seller (além dos empatados no máximo); None guarda todos
+        if reasons_top_k is None and os.getenv("SELLERS_REASONS_TOP_K"):
+            reasons_top_k = int(os.getenv("SELLERS_REASONS_TOP_K"))
+        self.reasons_top_k = reasons_top_k
         self.ctx = None
 
     def _connect_sharepoint(self):
@@ -38,258 +84,160 @@ class JsonSellerRepository(SellerRepository):
         """
         Retorna lista de arquivos JSON no diretório que estão dentro do intervalo de datas.
         """
-        files = []
+        days = self._days_in_range(start_date, end_date)
+        files = [file_path for _, _, file_path in self._download_files([sufix], days)]
+        return sorted(files)
 
+    def _days_in_range(self, start_date: date, end_date: date) -> list[date]:
+        start_date = start_date.date() if isinstance(start_date, datetime) else start_date
+        end_date = end_date.date() if isinstance(end_date, datetime) else end_date
+        days = []
         current_date = start_date
         while current_date <= end_date:
-            file_name = f"{current_date.strftime('%Y_%m_%d')}{sufix}.json"
-            file_path = self._download_file(file_name)
-            files.append(file_path)
+            days.append(current_date)
             current_date += timedelta(days=1)
+        return days
 
-        return sorted(files)
+    def _download_files(self, sufixes: list[str], days: list[date]) -> Iterator[tuple[date, str, str]]:
+        """
+        Baixa em paralelo todos os pares (dia, sufixo) informados.
+
+        Os downloads compartilham o mesmo ClientContext e são limitados por
+        `max_downloads`. Cada arquivo é devolvido assim que termina de baixar,
+        permitindo que a leitura comece antes do fim dos demais downloads.
+
+        Yields:
+            tuple[date, str, str]: Dia, sufixo e caminho local de cada arquivo baixado
+        """
+        if not self.ctx:
+            self._connect_sharepoint()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_downloads)
+        try:
+            futures = {
+                executor.submit(self._download_file, f"{day.strftime('%Y_%m_%d')}{sufix}.json"): (day, sufix)
+                for day in days
+                for sufix in sufixes
+            }
+            for future in as_completed(futures):
+                day, sufix = futures[future]
+                yield day, sufix, future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def _download_file(self, file_name: str) -> str:
         """
-        Faz download de um arquivo do SharePoint.
-        
+        Faz download de um arquivo do SharePoint, passando pelo cache local.
+
+        Arquivos de dias fechados já presentes no cache são usados sem acesso
+        à rede, e os que faltam são baixados sem consultar a versão. Os demais
+        são revalidados pelo ETag/data de modificação e só são baixados
+        novamente quando mudaram.
+
         Args:
-            file_url (str): URL relativa do arquivo no SharePoint
-            local_path (str): Caminho local onde o arquivo será salvo
-            library_name (str, optional): Nome da biblioteca de documentos. Defaults to None.
-            
+            file_name (str): Nome do arquivo na pasta do SharePoint
+
         Returns:
-            bool: True se o download foi bem sucedido, False caso contrário
+            str: Caminho local do arquivo
         """
         try:
             if not self.ctx:
                 self._connect_sharepoint()
 
-            temp_file = f"/tmp/{file_name}"
-
             file_url = f"{self.folder_path}/{file_name}"
 
-            file = self.ctx.web.get_file_by_server_relative_url(file_url)
-
-            os.makedirs(os.path.dirname(temp_file), exist_ok=True)
-
-            with open(temp_file, "wb") as local_file:
-                file.download(local_file).execute_query()
-
-            print(f"Arquivo baixado com sucesso: {temp_file}")
-            return temp_file
+            entry = self.cache.get(file_url)
+            if self._is_closed_day(self._file_date(file_name)):
+                # Arquivos de dias fechados não mudam: usa o cache sem acessar a
+                # rede e, se ainda não estiver nele, baixa sem consultar a versão
+                if entry:
+                    return entry.path
+                etag, last_modified = None, None
+            else:
+                etag, last_modified = self._get_file_version(file_url)
+                if entry and (
+                    (etag and entry.etag == etag)
+                    or (not etag and last_modified and entry.last_modified == last_modified)
+                ):
+                    return entry.path
+
+            # Requisição direta: não usa a fila de queries do ClientContext,
+            # que não pode ser compartilhada entre threads
+            response = File.open_binary(self.ctx, file_url)
+            entry = self.cache.put(file_url, response.content, etag, last_modified)
+
+            print(f"Arquivo baixado com sucesso: {entry.path}")
+            return entry.path
         except Exception as e:
             print(f"Erro ao fazer download do arquivo: {str(e)}")
             raise DownloadError(f"Erro ao fazer download do arquivo: {str(e)}")
 
-    def _read_files_order(self, files: list[str]) -> list[dict]:
-        data = []
-        for file in files:
-            with open(file, 'r', encoding='utf-8') as file:
-                data.extend(json.load(file))
-        return data
+    def _file_date(self, file_name: str) -> date | None:
+        try:
+            return datetime.strptime(file_name[:10], '%Y_%m_%d').date()
+        except ValueError:
+            return None
 
-    def _aggregate_data_by_poc_id(self, data_list: List[Dict[str, Any]]) -> list[dict]:
+    def _is_closed_day(self, day: date | None) -> bool:
         """
-        Agrega dados por dim_poc[ID], somando os campos numéricos.
+        Verifica se o dia já está fechado, ou seja, é anterior à janela de
+        revalidação. Os arquivos de dias fechados não mudam mais.
         """
-        aggregated = defaultdict(lambda: {
-            'ID': None,
-            'pedidos_gerados': 0,
-            'cancelado_entregador': 0,
-            'cancelado_pdv': 0,
-            'cancelado_usuario': 0,
-            'pedidos_rejeitados': 0,
-            'pedidos_expirados': 0,
-            'fill_rate': 0,
-            'motocas': [],
-            'motivos': []
-        })
-
-        for record in data_list:
-            poc_id = record.get('dim_poc[ID]')
-            if poc_id is None:
-                print(f"POC {poc_id} não existe")
-                continue
-
-            # Se é o primeiro registro para este POC, copia os campos de dimensão
-            if aggregated[poc_id]['ID'] is None:
-                aggregated[poc_id]['ID'] = poc_id
-
-            # Soma os campos numéricos
-            numeric_fields = {
-                "[Pedidos_Gerados_PDV]": "pedidos_gerados",
-                "[Cancelado_Entregador_PDV]": "cancelado_entregador",
-                "[Cancelado_PDV_PDV]": "cancelado_pdv",
-                "[Cancelado_Usuário_PDV]": "cancelado_usuario",
-                "[Pedidos_Rejeitados_PDV]": "pedidos_rejeitados",
-                "[Pedidos_Expirados_PDV]": "pedidos_expirados"
-            }
+        if day is None:
+            return False
+        return day < date.today() - timedelta(days=self.cache_revalidate_days)
 
-            for field, key in numeric_fields.items():
-                value = record.get(field, 0)
-                if isinstance(value, (int, float)):
-                    aggregated[poc_id][key] += value
-            pedidos_gerados = aggregated[poc_id]['pedidos_gerados']
-            cancelado_entregador = aggregated[poc_id]['cancelado_entregador']
-            cancelado_pdv = aggregated[poc_id]['cancelado_pdv']
-            cancelado_usuario = aggregated[poc_id]['cancelado_usuario']
-            pedidos_rejeitados = aggregated[poc_id]['pedidos_rejeitados']
-            pedidos_expirados = aggregated[poc_id]['pedidos_expirados']      
-            cancelados = cancelado_entregador + cancelado_pdv + cancelado_usuario
-            rate = (
-                Decimal(
-                    pedidos_gerados - (cancelados + pedidos_expirados + pedidos_rejeitados)
-                ) / Decimal(pedidos_gerados) * 100
-            )
-            aggregated[poc_id]["fill_rate"] = float(rate.quantize(Decimal('0.1'), rounding=ROUND_UP))
-
-        return [value for value in aggregated.values()]
-
-    def _read_files_reasons(self, files: list[str]) -> pd.DataFrame:
-        data = []
-        for file in files:
-            with open(file, 'r', encoding='utf-8') as file:
-                data.extend(json.load(file))   
-
-        # Agrupar por ID, Tipo, Motivo, Data  e Hora
-        grouped_data = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(int)))))
-
-        for record in data:
-            id_record = record.get("[ID]")
-            tipo = record.get("[Tipo]")
-            motivo = record.get("[Motivo]")
-            # data = datetime.strptime(record.get("[Data]"), '%Y/%m/%d').date()
-            data = record.get("[Data]")
-            hora = record.get("[Hora]")
-            quantity = record.get("[Quantity]", 0)
-
-            grouped_data[id_record][tipo][motivo][data][hora] += quantity
-
-        # Converter para um formato mais legível
-        results = []
-        for id_record in grouped_data:
-            for tipo in grouped_data[id_record]:
-                for motivo in grouped_data[id_record][tipo]:
-                    for data in grouped_data[id_record][tipo][motivo]:
-                        for hora in grouped_data[id_record][tipo][motivo][data]:
-                            results.append({
-                                "ID": id_record,
-                                "tipo": tipo,
-                                "motivo": motivo,
-                                "data": data,
-                                "hora": hora,
-                                "quantidade": grouped_data[id_record][tipo][motivo][data][hora]
-                            })
-
-        # Criar DataFrame para melhor visualização
-        df = pd.DataFrame(results)
-
-        # Ordenar por ID, Tipo, Motivo e Hora
-        df = df.sort_values(['ID', 'tipo', 'motivo', 'data', 'hora'])
-        return df
-
-    def _read_files_courrier(self, files: list[str]) -> pd.DataFrame:
-        data = []
-        for file in files:
-            with open(file, 'r', encoding='utf-8') as file:
-                data.extend(json.load(file))   
-
-        # Agrupar por ID, delivery_man
-        grouped_data = defaultdict(lambda: defaultdict(int))
-
-        for record in data:
-            id_record = record.get("dim_poc[ID]")
-            delivery_man = record.get("fact_fill_rate_pdvs[deliveryman_email]", "N/A")
-            quantity = record.get("[Canc_motoca]", 0)
-
-            grouped_data[id_record][delivery_man] += quantity
-
-        # Converter para um formato mais legível
-        results = []
-        for id_record in grouped_data:
-            for delivery_man in grouped_data[id_record]:
-                results.append({
-                    "ID": id_record,
-                    "email": delivery_man,
-                    "quantidade": grouped_data[id_record][delivery_man]
-                })
-
-        # Criar DataFrame para melhor visualização
-        df = pd.DataFrame(results)
-
-        # Ordenar por ID, delivery_man
-        df = df.sort_values(['ID', 'email'])
-        return df    
+    def _get_file_version(self, file_url: str) -> tuple[str | None, str | None]:
+        """
+        Consulta o ETag e a data de modificação do arquivo sem baixar o conteúdo.
+        """
+        url = quote(
+            f"{self.ctx.service_root_url()}/web/getFileByServerRelativePath(DecodedUrl='{unquote(file_url)}')",
+            safe=":/'()=",
+        )
+        request = RequestOptions(f"{url}?$select=ETag,TimeLastModified")
+        request.set_header("Accept", "application/json;odata=nometadata")
+        response = self.ctx.pending_request().execute_request_direct(request)
+        data = response.json()
+        return data.get("ETag"), data.get("TimeLastModified")
 
     def _update_orders_with_reasons(self, orders: list[dict], reasons: pd.DataFrame) -> list[dict]:
         """
         Atualiza as ordens com os motivos de cancelamento.
+
+        O ranking dos motivos é calculado para todos os sellers em uma única
+        passada sobre a tabela de motivos. Com `reasons_top_k`, cada seller
+        guarda só os primeiros horários (e os empatados no máximo, usados nas
+        mensagens) e um resumo de todos eles.
         """
+        if self.reasons_top_k is None:
+            ranked, summaries = rank_reasons(reasons), {}
+        else:
+            ranked, summaries = rank_reasons_bounded(reasons, self.reasons_top_k)
         for order in orders:
-            order_id = order.get("ID")
-
-            if order_id and not reasons.empty:
-                order_reasons = reasons[reasons['ID'] == order_id]
-                if not order_reasons.empty:
-                    # Agrupa por tipo e soma as quantidades
-                    tipo_quantidade = order_reasons.groupby('tipo')['quantidade'].sum().reset_index()
-                    # Pega o tipo com maior quantidade
-                    tipo_maior = tipo_quantidade.loc[tipo_quantidade['quantidade'].idxmax(), 'tipo']
-
-                    # Filtra apenas os registros do tipo com maior quantidade
-                    tipo = order_reasons[order_reasons['tipo'] == tipo_maior]
-                    motivo_quantidade = tipo.groupby(['tipo', 'motivo'])['quantidade'].sum().reset_index()
-                    motivo_maior = motivo_quantidade.loc[motivo_quantidade['quantidade'].idxmax(), 'motivo']
-
-                    motivo = tipo[tipo['motivo'] == motivo_maior]
-                    data_hora = motivo.groupby(['tipo', 'motivo', 'data', 'hora'])['quantidade'].sum().reset_index()
-                    # data_hora = data_hora[data_hora['quantidade'] >= 2]
-                    data_hora = data_hora.sort_values('quantidade', ascending=False)
-                    reasons_list = data_hora.to_dict('records')
-                    # if len(reasons_list) and int(reasons_list[0]['quantidade']) < 2:
-                    #     reasons_list = []
-                    # top_reasons = grouped_reasons.nlargest(2, 'quantidade')
-                    # reasons_list = top_reasons.to_dict('records')
-                    # if len(reasons_list) > 1:
-                    #     nlargest = 2
-                    #     while reasons_list[0]['tipo'] != reasons_list[nlargest-1]['tipo']:
-                    #         nlargest += 1
-                    #         top_reasons = grouped_reasons.nlargest(nlargest, 'quantidade')
-                    #         reasons_list = top_reasons.to_dict('records')
-                    #     reasons_list = [reasons_list[0], reasons_list[nlargest-1]]
-                    order['motivos'] = reasons_list
-                else:
-                    order['motivos'] = []
-            else:
-                order['motivos'] = []
+            order['motivos'] = ranked.get(order.get("ID"), [])
+            order['motivos_resumo'] = summaries.get(order.get("ID"))
 
         return orders
 
     def _update_orders_with_courrier(self, orders: list[dict], courriers: pd.DataFrame) -> list[dict]:
         """
-        Atualiza as ordens com os motivos de cancelamento.
+        Atualiza as ordens com os entregadores que mais cancelaram.
+
+        Só recebem entregadores os POCs em que o cancelamento pelo entregador é
+        o maior ofensor. Os `courrier_top_k` maiores de cada POC são
+        calculados em uma única passada sobre a tabela de entregadores.
         """
+        top = top_courriers(courriers, self.courrier_top_k)
         for order in orders:
-            order_id = order.get("ID")
             cancelado_entregador = order.get("cancelado_entregador")
-            cancelado_pdv = order.get("cancelado_pdv")
-            cancelado_usuario = order.get("cancelado_usuario")
-            pedidos_expirados = order.get("pedidos_expirados")
-            pedidos_rejeitados = order.get("pedidos_rejeitados")
             if (
-                cancelado_entregador > cancelado_pdv
-                and cancelado_entregador > cancelado_usuario
-                and cancelado_entregador > pedidos_expirados
-                and cancelado_entregador > pedidos_rejeitados
+                cancelado_entregador > order.get("cancelado_pdv")
+                and cancelado_entregador > order.get("cancelado_usuario")
+                and cancelado_entregador > order.get("pedidos_expirados")
+                and cancelado_entregador > order.get("pedidos_rejeitados")
             ):
-                if order_id and not courriers.empty:
-                    order_courriers = courriers[courriers['ID'] == order_id]
-                    if not order_courriers.empty:
-                        grouped_courriers = order_courriers.groupby(['email'])['quantidade'].sum().reset_index()
-                        top_courriers = grouped_courriers.nlargest(2, 'quantidade')
-                        courriers_list = top_courriers.to_dict('records')
-                        order['motocas'] = courriers_list
+                order['motocas'] = top.get(order.get("ID"), [])
 
         return orders
 
@@ -314,40 +262,127 @@ class JsonSellerRepository(SellerRepository):
                     )
                     for reason in seller["motivos"]
                 ],
-                # courriers_cancel=[
-                #     CourrierCancel(
-                #         email=courrier["email"], quantity=courrier["quantidade"]
-                #     )
-                #     for courrier in seller["motocas"]
-                # ],
+                reasons_summary=(
+                    ReasonsSummary(**seller["motivos_resumo"]) if seller.get("motivos_resumo") else None
+                ),
+                courriers_cancel=[
+                    CourrierCancel(
+                        email=courrier["email"], quantity=courrier["quantidade"]
+                    )
+                    for courrier in seller["motocas"]
+                ],
             )
             sellers_report.append(seller_report)
         return sellers_report
 
+    def _partial_tables(self) -> dict[str, str]:
+        """Tabelas parciais de cada dia e o sufixo do arquivo de origem."""
+        tables = {"orders": self.FILL_RATE_SUFIX, "reasons": self.REASONS_SUFIX}
+        if self.include_courriers:
+            tables["courriers"] = self.COURRIER_SUFIX
+        return tables
+
+    def _load_partials(self, days: list[date]) -> dict[date, dict[str, pd.DataFrame]]:
+        """
+        Retorna os agregados parciais (pedidos, motivos e, se habilitado,
+        entregadores) de cada dia.
+
+        Dias fechados já processados são lidos do armazenamento local. Apenas
+        os dias que faltam são baixados e agregados; os fechados entre eles
+        são salvos para as próximas execuções.
+        """
+        tables = self._partial_tables()
+        partials = {}
+        missing = []
+        for day in days:
+            partial = self.partial_store.load(day, list(tables)) if self._is_closed_day(day) else None
+            if partial is None:
+                missing.append(day)
+            else:
+                partials[day] = partial
+
+        if not missing:
+            return partials
+
+        # Baixa os arquivos de todas as tabelas ao mesmo tempo e agrega cada
+        # arquivo assim que o download termina. Com `ingest_workers` > 1 a
+        # agregação roda em um pool de processos; cada arquivo gera o parcial
+        # de uma tabela de um dia, então o resultado é o mesmo do modo serial
+        table_by_sufix = {sufix: name for name, sufix in tables.items()}
+        results = {day: {} for day in missing}
+        pool = None
+        if self.ingest_workers > 1:
+            pool = ProcessPoolExecutor(max_workers=self.ingest_workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            futures = {}
+            for day, sufix, file_path in self._download_files(list(table_by_sufix), missing):
+                name = table_by_sufix[sufix]
+                if pool:
+                    futures[pool.submit(aggregate_file, self.fact_store, name, sufix, file_path)] = (day, name)
+                else:
+                    results[day][name] = aggregate_file(self.fact_store, name, sufix, file_path)
+            for future in as_completed(futures):
+                day, name = futures[future]
+                results[day][name] = future.result()
+        finally:
+            if pool:
+                pool.shutdown(wait=True, cancel_futures=True)
+        self.fact_store.evict()
+
+        for day in missing:
+            partial = {name: results[day][name] for name in tables}
+            if self._is_closed_day(day):
+                self.partial_store.save(day, partial)
+            partials[day] = partial
+
+        return partials
+
     def get_sellers(self, start_date: datetime, end_date: datetime) -> list[SellerReport]:
         """
         Obtém os vendedores.
+
+        O intervalo é respondido somando os agregados parciais de cada dia.
         """ 
-        files_order   = self.get_files_in_date_range('_fill_rate_data', start_date, end_date)
-        files_reasons = self.get_files_in_date_range('_reasons_fill_rate_data', start_date, end_date)
-        # files_courrier  = self.get_files_in_date_range('_fill_rate_motoca', start_date, end_date)
+        return self.get_sellers_many([(start_date, end_date)])[0]
+
+    def get_sellers_many(self, windows: list[tuple[datetime, datetime]]) -> list[list[SellerReport]]:
+        """
+        Obtém os vendedores de várias janelas de datas de uma vez.
+
+        Os dias de todas as janelas são carregados uma única vez, mesmo quando
+        as janelas se sobrepõem ou são vizinhas (por exemplo, esta semana e a
+        anterior), e cada janela é montada a partir dos parciais diários.
 
-        orders = self._read_files_order(files_order)
-        reasons = self._read_files_reasons(files_reasons)
-        # courrier = self._read_files_courrier(files_courrier)
+        Returns:
+            list[list[SellerReport]]: Uma lista de vendedores por janela, na mesma ordem
+        """
+        window_days = [self._days_in_range(start_date, end_date) for start_date, end_date in windows]
+        all_days = sorted({day for days in window_days for day in days})
+        partials = self._load_partials(all_days)
+        return [self._build_sellers([partials[day] for day in days]) for days in window_days]
+
+    def _build_sellers(self, partials: list[dict[str, pd.DataFrame]]) -> list[SellerReport]:
+        """
+        Soma os parciais diários de uma janela e monta os relatórios dos vendedores.
+        """
+        order_aggregator = OrderAggregator()
+        for partial in partials:
+            order_aggregator.add_frame(partial["orders"])
+        reasons = merge_reasons([partial["reasons"] for partial in partials])
 
-        orders = self._aggregate_data_by_poc_id(orders)
+        orders = order_aggregator.result()
         # Ordena as ordens pelo ID para garantir consistência
         orders = sorted(orders, key=lambda x: x.get('ID', ''))
-        # print(orders)
         # Atualiza as ordens com os motivos de cancelamento
         orders = self._update_orders_with_reasons(orders, reasons)
-        # orders = self._update_orders_with_courrier(orders, courrier)
+        if self.include_courriers:
+            courriers = merge_courriers([partial["courriers"] for partial in partials])
+            orders = self._update_orders_with_courrier(orders, courriers)
 
         sellers = self.output_sellers(orders)
-        for seller in sellers:
-            seller.fill_rate = seller._fill_rate()
-            seller.status = seller._status()
-            seller.message = seller.message_to_seller()
+        # Fill rate e status de todos os vendedores calculados de uma vez
+        SellerReportBatch.from_reports(sellers).classify(sellers)
+        for seller, messages in zip(sellers, render_messages(sellers, [Channel.CRM])):
+            seller.message = messages.crm
 
         return sellers
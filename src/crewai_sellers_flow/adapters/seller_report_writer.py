@@ -0,0 +1,221 @@
+import gzip
+import json
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from crewai_sellers_flow.domain.seller_report import SellerReport
+
+# Formato pelo sufixo do arquivo
+FORMATS = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".gz": "ndjson.gz",
+    ".parquet": "parquet",
+    ".json": "json",
+}
+
+SELLER_REPORT_SCHEMA = pa.schema([
+    ("seller_id", pa.int64()),
+    ("orders_managed", pa.int64()),
+    ("canceled_by_seller", pa.int64()),
+    ("canceled_by_consumer", pa.int64()),
+    ("canceled_on_delivery", pa.int64()),
+    ("expired", pa.int64()),
+    ("rejected", pa.int64()),
+    ("fill_rate", pa.float64()),
+    ("status", pa.string()),
+    ("message", pa.string()),
+    ("stockout_top_product", pa.string()),
+    ("reasons_cancel", pa.list_(pa.struct([
+        ("type", pa.string()),
+        ("reason", pa.string()),
+        ("date", pa.date32()),
+        ("hour", pa.int64()),
+        ("quantity", pa.int64()),
+    ]))),
+    ("reasons_summary", pa.struct([
+        ("total", pa.int64()),
+        ("slots", pa.int64()),
+        ("max_quantity", pa.int64()),
+        ("ties_at_max", pa.int64()),
+    ])),
+    ("courriers_cancel", pa.list_(pa.struct([
+        ("email", pa.string()),
+        ("quantity", pa.int64()),
+    ]))),
+])
+
+
+def _format_for(path: Path, format: str | None) -> str:
+    if format:
+        return format
+    if path.suffix not in FORMATS:
+        raise ValueError(f"Formato de relatório desconhecido: {path}")
+    return FORMATS[path.suffix]
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+class SellerReportWriter:
+    """Grava os relatórios dos vendedores à medida que são produzidos.
+
+    Formatos (escolhidos pelo sufixo do arquivo ou por `format`):
+    - ndjson (.ndjson/.jsonl): um JSON compacto por linha;
+    - ndjson.gz (.gz): o mesmo, comprimido com gzip;
+    - parquet (.parquet): colunar, gravado em blocos de `batch_size` vendedores;
+    - json (.json): array JSON indentado, apenas para depuração.
+
+    Só o vendedor atual (ou o bloco atual, no parquet) fica em memória. Para
+    o ndjson também é gravado um índice (`<arquivo>.idx`) com a posição de
+    cada linha, usado pelo SellerReportReader para acessar um vendedor direto.
+    """
+
+    def __init__(self, path: str, format: str | None = None, indent: int = 4, batch_size: int = 1024):
+        self.path = Path(path)
+        self.format = _format_for(self.path, format)
+        self.indent = indent
+        self.batch_size = batch_size
+        self.count = 0
+        self._offsets = array('q')
+        self._rows: list[dict] = []
+        self._writer: pq.ParquetWriter | None = None
+
+        if self.format == "parquet":
+            self._file = None
+        elif self.format == "ndjson.gz":
+            self._file = gzip.open(self.path, "wb")
+        else:
+            self._file = open(self.path, "wb")
+            if self.format == "json":
+                self._file.write(b"[")
+
+    def __enter__(self) -> "SellerReportWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, report: SellerReport) -> None:
+        if self.format == "parquet":
+            row = report.model_dump()
+            row["status"] = report.status.value if report.status else None
+            self._rows.append(row)
+            if len(self._rows) >= self.batch_size:
+                self._flush_rows()
+        elif self.format == "json":
+            if self.count:
+                self._file.write(b",")
+            self._file.write(report.model_dump_json(indent=self.indent).encode())
+        else:
+            self._offsets.append(self._file.tell())
+            self._file.write(report.model_dump_json().encode())
+            self._file.write(b"\n")
+        self.count += 1
+
+    def write_all(self, reports: Iterable[SellerReport]) -> int:
+        for report in reports:
+            self.write(report)
+        return self.count
+
+    def _flush_rows(self) -> None:
+        if not self._rows:
+            return
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, SELLER_REPORT_SCHEMA)
+        self._writer.write_table(pa.Table.from_pylist(self._rows, schema=SELLER_REPORT_SCHEMA))
+        self._rows = []
+
+    def close(self) -> None:
+        if self.format == "parquet":
+            self._flush_rows()
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, SELLER_REPORT_SCHEMA)
+            self._writer.close()
+            return
+
+        if self._file.closed:
+            return
+        if self.format == "json":
+            self._file.write(b"]")
+        self._file.close()
+        if self.format.startswith("ndjson"):
+            with open(_index_path(self.path), "wb") as index:
+                self._offsets.tofile(index)
+
+
+class SellerReportReader:
+    """Lê um arquivo gravado pelo SellerReportWriter sem carregá-lo inteiro.
+
+    Permite iterar os vendedores (`for report in reader`, a partir de
+    `start`) e acessar um vendedor pela posição (`reader[i]`) usando o
+    índice do ndjson ou os row groups do parquet. O formato json, de
+    depuração, só é lido inteiro.
+    """
+
+    def __init__(self, path: str, format: str | None = None):
+        self.path = Path(path)
+        self.format = _format_for(self.path, format)
+        self._offsets: array | None = None
+
+    def _open(self):
+        return gzip.open(self.path, "rb") if self.format == "ndjson.gz" else open(self.path, "rb")
+
+    def offsets(self) -> array:
+        if self._offsets is None:
+            offsets = array('q')
+            index_path = _index_path(self.path)
+            with open(index_path, "rb") as index:
+                offsets.frombytes(index.read())
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self) -> int:
+        if self.format == "parquet":
+            return pq.ParquetFile(self.path).metadata.num_rows
+        if self.format == "json":
+            return sum(1 for _ in self)
+        return len(self.offsets())
+
+    def __iter__(self) -> Iterator[SellerReport]:
+        return self.iter(0)
+
+    def iter(self, start: int = 0) -> Iterator[SellerReport]:
+        if self.format == "parquet":
+            yield from self._iter_parquet(start)
+        elif self.format == "json":
+            with open(self.path, "rb") as file:
+                reports = [SellerReport.model_validate(item) for item in json.load(file)]
+            yield from reports[start:]
+        else:
+            with self._open() as file:
+                if start:
+                    offsets = self.offsets()
+                    if start >= len(offsets):
+                        return
+                    file.seek(offsets[start])
+                for line in file:
+                    yield SellerReport.model_validate_json(line)
+
+    def __getitem__(self, index: int) -> SellerReport:
+        if index < 0:
+            index += len(self)
+        for report in self.iter(index):
+            return report
+        raise IndexError(index)
+
+    def _iter_parquet(self, start: int) -> Iterator[SellerReport]:
+        file = pq.ParquetFile(self.path)
+        first_row = 0
+        for group in range(file.num_row_groups):
+            rows = file.metadata.row_group(group).num_rows
+            if first_row + rows > start:
+                for row in file.read_row_group(group).to_pylist()[max(start - first_row, 0):]:
+                    yield SellerReport.model_validate(row)
+            first_row += rows
+
@@ -0,0 +1,91 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+from pydantic import BaseModel
+from crewai_sellers_flow.adapters.atomic_file import atomic_write_bytes
+
+
+class SharePointFileCache:
+    """Cache local e persistente dos arquivos baixados do SharePoint.
+
+    Cada arquivo é identificado pela sua URL relativa ao servidor e guardado
+    junto com um arquivo de metadados (ETag e data de modificação) usado na
+    revalidação. As escritas são atômicas (arquivo temporário + rename), o que
+    permite que várias execuções compartilhem o mesmo diretório. Quando o
+    tamanho total passa de `max_bytes`, os arquivos menos usados recentemente
+    são removidos. O último uso fica na data de modificação do arquivo de
+    metadados: a do arquivo de dados só muda quando o conteúdo muda, e é
+    usada por quem deriva arquivos dele (como o ColumnarFactStore).
+    """
+
+    class Entry(BaseModel):
+        path: str
+        etag: str | None = None
+        last_modified: str | None = None
+
+    def __init__(self, cache_dir: str | None = None, max_bytes: int | None = None):
+        self.cache_dir = Path(
+            cache_dir or os.getenv("SHAREPOINT_CACHE_DIR", "/tmp/crewai_sellers_flow_cache")
+        )
+        self.max_bytes = max_bytes or int(os.getenv("SHAREPOINT_CACHE_MAX_BYTES", str(2 * 1024**3)))
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        name = f"{key}-{os.path.basename(url)}"
+        return self.cache_dir / name, self.cache_dir / f"{name}.meta"
+
+    def get(self, url: str) -> Entry | None:
+        """Retorna a entrada do cache para a URL ou None se não existir."""
+        data_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as file:
+                meta = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not data_path.exists():
+            return None
+        self.touch(url)
+        return self.Entry(path=str(data_path), etag=meta.get("etag"), last_modified=meta.get("last_modified"))
+
+    def put(self, url: str, content: bytes, etag: str | None = None, last_modified: str | None = None) -> Entry:
+        """Grava o conteúdo da URL no cache de forma atômica."""
+        data_path, meta_path = self._paths(url)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(data_path, content)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "size": len(content)}
+        atomic_write_bytes(meta_path, json.dumps(meta).encode("utf-8"))
+        self.evict()
+        return self.Entry(path=str(data_path), etag=etag, last_modified=last_modified)
+
+    def touch(self, url: str) -> None:
+        """Marca a entrada como usada agora (ordem da política LRU)."""
+        _, meta_path = self._paths(url)
+        try:
+            os.utime(meta_path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> None:
+        """Remove as entradas usadas há mais tempo até caber em `max_bytes`."""
+        entries = []
+        total = 0
+        for meta_path in self.cache_dir.glob("*.meta"):
+            data_path = meta_path.with_suffix("")
+            try:
+                size = data_path.stat().st_size
+                used = meta_path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            entries.append((used, size, data_path, meta_path))
+            total += size
+
+        for _, size, data_path, meta_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in (meta_path, data_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= size
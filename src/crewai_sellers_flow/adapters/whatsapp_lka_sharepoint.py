@@ -1,32 +1,84 @@
-from crewai_sellers_flow.ports.whatsapp_lka_repository import WhatsappLKARepository
+from crewai_sellers_flow.ports.whatsapp_lka_repository import LKAStatus, WhatsappLKARepository
 from pydantic import BaseModel
 import os
+import json
 import requests
 from office365.sharepoint.client_context import ClientContext
 from office365.runtime.auth.client_credential import ClientCredential
+from office365.runtime.http.request_options import RequestOptions
 import pandas as pd
 from crewai_sellers_flow.adapters.lka_repository import LKA_INSTANCES
+from crewai_sellers_flow.adapters.sharepoint_file_cache import SharePointFileCache
 from collections import defaultdict
+from typing import Iterable
 class WhatsappLKASharepoint(WhatsappLKARepository): 
     """Adapter para o repositório de LKA dos sellers."""
 
-    def __init__(self):
+    # Incrementar quando o formato do índice mudar, para invalidar os snapshots antigos
+    SNAPSHOT_VERSION = 2
+
+    def __init__(self, cache: SharePointFileCache | None = None):
         self.site_url = os.getenv("SHAREPOINT_ZLABS_SITE_URL")
         self.client_id = os.getenv("SHAREPOINT_CLIENT_ID")
         self.client_secret = os.getenv("SHAREPOINT_CLIENT_SEC")
         self.file_id = os.getenv("SHAREPOINT_ZLABS_FILE_ID")
+        # Snapshot do índice de sellers, guardado no mesmo cache dos arquivos do SharePoint
+        self.cache = cache or SharePointFileCache()
         self.ctx = None
         self._sellers_index = None
+        # Instância de cada telefone de LKA; em telefones repetidos vale a primeira
+        self._instances_by_phone = {}
+        for item in LKA_INSTANCES:
+            self._instances_by_phone.setdefault(item["phoneNumber"], item)
 
-    class LKA(BaseModel):
-        instance: str
-        token: str
+    class LKA(WhatsappLKARepository.Output):
         phone_seller: str
 
     def setup(self):
-        if self._sellers_index is None:
-            file_name = self._download_file("Mailing Sellers.xlsx")
-            self._build_sellers_index(file_name)
+        """Carrega o índice de sellers do "Mailing Sellers.xlsx".
+
+        O índice montado a partir da planilha é guardado como snapshot JSON
+        junto com o ETag do arquivo (JSON e não pickle: o cache fica em um
+        diretório compartilhado e carregar o snapshot não pode executar
+        código). Nas execuções seguintes apenas o ETag é consultado no
+        SharePoint: se não mudou, o snapshot é carregado direto, sem baixar
+        nem reler a planilha.
+        """
+        if self._sellers_index is not None:
+            return
+
+        snapshot_key = f"lka-index/v{self.SNAPSHOT_VERSION}/{self.file_id}"
+        etag = self._get_file_etag()
+        entry = self.cache.get(snapshot_key)
+        if entry is not None and etag is not None and entry.etag == etag:
+            with open(entry.path, "r", encoding="utf-8") as snapshot:
+                self._sellers_index = {int(poc): seller for poc, seller in json.load(snapshot).items()}
+            print(f"Índice de sellers carregado do snapshot ({len(self._sellers_index)} POCs)")
+            return
+
+        file_name = self._download_file("Mailing Sellers.xlsx")
+        self._build_sellers_index(file_name)
+        if etag is not None:
+            # Valores da planilha que não são JSON (como datas) são guardados como texto
+            snapshot = json.dumps(self._sellers_index, ensure_ascii=False, default=str)
+            self.cache.put(snapshot_key, snapshot.encode("utf-8"), etag=etag)
+
+    def _get_file_etag(self) -> str | None:
+        """
+        Consulta o ETag da planilha sem baixar o conteúdo. Retorna None se a
+        consulta falhar, e nesse caso a planilha é baixada normalmente.
+        """
+        try:
+            if not self.ctx:
+                self._connect_sharepoint()
+            request = RequestOptions(f"{self.ctx.service_root_url()}/web/GetFileById('{self.file_id}')?$select=ETag")
+            request.set_header("Accept", "application/json;odata=nometadata")
+            response = self.ctx.pending_request().execute_request_direct(request)
+            response.raise_for_status()
+            return response.json().get("ETag")
+        except Exception as e:
+            print(f"Erro ao consultar a versão do arquivo: {str(e)}")
+            return None
 
     def _connect_sharepoint(self):
         """
@@ -119,29 +171,49 @@ class WhatsappLKASharepoint(WhatsappLKARepository):
         self._sellers_index = index
 
     def get_lka(self, seller_id: int) -> LKA:
+        resolution = self.get_lka_many([seller_id])[int(seller_id)]
+        if resolution.status != LKAStatus.RESOLVED:
+            raise ValueError(resolution.error)
+        return resolution.lka
+
+    def get_lka_many(self, seller_ids: Iterable[int]) -> dict[int, WhatsappLKARepository.Resolution]:
         self.setup()
+        return {int(seller_id): self._resolve(int(seller_id)) for seller_id in seller_ids}
 
-        seller = self._sellers_index.get(int(seller_id))
+    def _resolve(self, seller_id: int) -> WhatsappLKARepository.Resolution:
+        seller = self._sellers_index.get(seller_id)
         if not seller:
-            raise ValueError(f"POC com ID {seller_id} não encontrado no arquivo Mailing Sellers.xlsx")
+            return self.Resolution(
+                seller_id=seller_id,
+                status=LKAStatus.POC_NOT_FOUND,
+                error=f"POC com ID {seller_id} não encontrado no arquivo Mailing Sellers.xlsx",
+            )
 
-        instance = next(
-            (item for item in LKA_INSTANCES if item["phoneNumber"] == str(seller["lka_celular"])),
-            None,
-        )
+        instance = self._instances_by_phone.get(str(seller["lka_celular"]))
         if not instance:
-            raise ValueError(f"LKA não encontrado com fone {seller['lka_celular']}")
-        
-        if not seller["seller_weekly"]: 
-            raise ValueError(f"POC com ID {seller_id} está desabilitado para Sellers Weekly")
-
-        return self.LKA(
-            instance=instance["Instance"],
-            token=instance["Token"],
-            phone_seller=str(seller["celular"]),
+            return self.Resolution(
+                seller_id=seller_id,
+                status=LKAStatus.LKA_PHONE_UNKNOWN,
+                error=f"LKA não encontrado com fone {seller['lka_celular']}",
+            )
+
+        if not seller["seller_weekly"]:
+            return self.Resolution(
+                seller_id=seller_id,
+                status=LKAStatus.WEEKLY_OPT_OUT,
+                error=f"POC com ID {seller_id} está desabilitado para Sellers Weekly",
+            )
+
+        return self.Resolution(
+            seller_id=seller_id,
+            status=LKAStatus.RESOLVED,
+            lka=self.LKA(
+                instance=instance["Instance"],
+                token=instance["Token"],
+                phone_seller=str(seller["celular"]),
+            ),
         )
 
-
 if __name__ == "__main__":
     whatsapp_lka_sharepoint = WhatsappLKASharepoint()
     print(whatsapp_lka_sharepoint.get_lka(122852))
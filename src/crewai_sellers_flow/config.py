@@ -39,5 +39,14 @@ class Config:
     def MODEL(self) -> str:
         return os.environ["MODEL"]
 
+    @property
+    def SELLERS_REPORT_PATH(self) -> str:
+        # O formato segue o sufixo: .ndjson, .gz, .parquet ou .json (indentado, para depuração)
+        return os.getenv("SELLERS_REPORT_PATH", "resultado.ndjson.gz")
+
+    @property
+    def STOCKOUT_CSV_PATH(self) -> str:
+        return os.getenv("STOCKOUT_CSV_PATH", "downloads/STOCKOUT.csv")
+
     
 config = Config()
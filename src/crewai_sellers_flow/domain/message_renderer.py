@@ -0,0 +1,185 @@
+from datetime import date
+from enum import Enum
+from string import Formatter
+from typing import Any, Iterable, NamedTuple
+
+from crewai_sellers_flow.domain.message_template import ALERT, CONGRATS, CRITICAL, HEADER, NORMAL
+
+
+class Channel(Enum):
+    WHATSAPP = "WHATSAPP"
+    CRM = "CRM"
+
+
+# Indexado por date.weekday(), sem depender do locale do strftime("%A")
+DAYS_OF_WEEK = (
+    "à Segunda-feira",
+    "à Terça-feira",
+    "à Quarta-feira",
+    "à Quinta-feira",
+    "à Sexta-feira",
+    "ao Sábado",
+    "ao Domingo",
+)
+
+STOCKOUT_TOP_PRODUCT = "\n\nO produto de maior impacto nos seus cancelamentos essa semana foi: {}"
+
+SIGNATURE = "Equipe Zé Delivery"
+
+# Templates por status (valor do SellerStatus)
+TEMPLATES_BY_STATUS = {
+    "CRITICAL": CRITICAL,
+    "ALERT": ALERT,
+    "NORMAL": NORMAL,
+    "CONGRATS": CONGRATS,
+}
+
+CONGRATS_STATUS = "CONGRATS"
+
+# Chave usada quando o template não depende do tipo ou do motivo
+ANY = None
+
+
+class CompiledTemplate(NamedTuple):
+    """Template quebrado uma única vez em trechos fixos e campos a preencher."""
+
+    text: str
+    pieces: tuple[tuple[str, str | None], ...]
+    fields: frozenset[str]
+
+    def render(self, values: dict[str, str]) -> str:
+        return "".join(literal + values[field] if field else literal for literal, field in self.pieces)
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    pieces = tuple((literal, field) for literal, field, _, _ in Formatter().parse(text))
+    return CompiledTemplate(text, pieces, frozenset(field for _, field in pieces if field))
+
+
+def _compile_index() -> dict[tuple, CompiledTemplate]:
+    """Compila todas as combinações (status, tipo, motivo, canal).
+
+    Tipos cujo template não depende do motivo (como PDV_EXPIRED) e o status
+    CONGRATS (um único texto) são indexados com ANY no lugar do motivo e do tipo.
+    """
+    index = {}
+    for status, templates in TEMPLATES_BY_STATUS.items():
+        if isinstance(templates, str):
+            entries = {(ANY, ANY): templates}
+        else:
+            entries = {}
+            for type_, by_reason in templates.items():
+                if isinstance(by_reason, str):
+                    entries[(type_, ANY)] = by_reason
+                else:
+                    entries.update({(type_, reason): text for reason, text in by_reason.items()})
+
+        header = HEADER.get(status, '')
+        for (type_, reason), text in entries.items():
+            if not text:
+                continue
+            index[(status, type_, reason, Channel.WHATSAPP)] = compile_template(f"{header}\n\n{text}\n\n")
+            index[(status, type_, reason, Channel.CRM)] = compile_template(text)
+    return index
+
+
+TEMPLATE_INDEX = _compile_index()
+
+
+def find_template(status: Any, type_: str, reason: str, channel: Channel = Channel.WHATSAPP) -> CompiledTemplate | None:
+    """Template de um status, tipo e motivo no canal pedido, ou None se não houver."""
+    status = getattr(status, "value", status)
+    return (
+        TEMPLATE_INDEX.get((status, type_, reason, channel))
+        or TEMPLATE_INDEX.get((status, type_, ANY, channel))
+        or TEMPLATE_INDEX.get((status, ANY, ANY, channel))
+    )
+
+
+def day_of_week(day: date) -> str:
+    return DAYS_OF_WEEK[day.weekday()]
+
+
+def attention_slots(reasons: list) -> list[tuple[date, int]]:
+    """Dias e horas com mais cancelamentos (empatados com o primeiro motivo
+    com 2 ou mais cancelamentos), na ordem dos motivos."""
+    top = None
+    slots = []
+    for reason in reasons:
+        if reason.quantity < 2:
+            continue
+        if top is None:
+            top = reason.quantity
+        if reason.quantity == top:
+            slots.append((reason.date, reason.hour))
+    return slots
+
+
+def _slots_text(slots: list[tuple[date, int]], at: str) -> str:
+    return " e ".join(f"{day_of_week(day)} {at} {hour:02d}h" for day, hour in slots)
+
+
+class RenderedMessages(NamedTuple):
+    whatsapp: str | None
+    crm: str | None
+
+
+def _template_values(seller, fields: frozenset[str]) -> dict[str, str]:
+    # Só calcula os campos que o template usa
+    values = {}
+    if "FILL_RATE_CANCELED_ON_DELIVERY" in fields:
+        values["FILL_RATE_CANCELED_ON_DELIVERY"] = f"{seller.rate_canceled_on_delivery():.2f}%"
+    if "FILL_RATE_INDEX" in fields:
+        values["FILL_RATE_INDEX"] = f"{seller.fill_rate:.2f}%"
+    if "STOCKOUT_TOP_PRODUCT" in fields:
+        values["STOCKOUT_TOP_PRODUCT"] = (
+            STOCKOUT_TOP_PRODUCT.format(seller.stockout_top_product) if seller.stockout_top_product else ""
+        )
+    return values
+
+
+def render_whatsapp(seller, slots: list[tuple[date, int]] | None = None) -> str:
+    """Mensagem de WhatsApp do vendedor (vazia se não houver template)."""
+    reasons = seller.reasons_cancel
+    if not reasons:
+        return ""
+    template = find_template(seller.status, reasons[0].type, reasons[0].reason, Channel.WHATSAPP)
+    if template is None:
+        return ""
+
+    message = template.render(_template_values(seller, template.fields))
+    slots = attention_slots(reasons) if slots is None else slots
+    if slots and seller.status.value != CONGRATS_STATUS:
+        message += f"*Atenção {_slots_text(slots, 'às')}.*\nCancelamento é FALTA GRAVE.\n\n"
+    return message + SIGNATURE
+
+
+def render_crm(seller, slots: list[tuple[date, int]] | None = None) -> str | None:
+    """Mensagem curta enviada ao CRM, ou None para quem está com status de Congrats."""
+    if seller._status().value == CONGRATS_STATUS:
+        return None
+    slots = attention_slots(seller.reasons_cancel) if slots is None else slots
+    if not slots:
+        return None
+    return f"Atenção {_slots_text(slots, 'as')}. Cancelamento é FALTA GRAVE."
+
+
+def render_messages(
+    sellers: Iterable, channels: Iterable[Channel] = (Channel.WHATSAPP, Channel.CRM)
+) -> list[RenderedMessages]:
+    """Gera as mensagens dos canais pedidos para um lote de vendedores.
+
+    Os dias e horários de atenção de cada vendedor são calculados uma vez e
+    usados em todos os canais; canais não pedidos ficam com None.
+    """
+    channels = frozenset(channels)
+    whatsapp = Channel.WHATSAPP in channels
+    crm = Channel.CRM in channels
+    rendered = []
+    for seller in sellers:
+        slots = attention_slots(seller.reasons_cancel)
+        rendered.append(RenderedMessages(
+            render_whatsapp(seller, slots) if whatsapp else None,
+            render_crm(seller, slots) if crm else None,
+        ))
+    return rendered
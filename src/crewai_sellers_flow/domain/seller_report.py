@@ -1,9 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, PrivateAttr
+from typing import Any, Callable, ClassVar, Iterable, Optional
 from datetime import date
 from decimal import Decimal, ROUND_UP
 from enum import Enum
-from crewai_sellers_flow.domain.message_template import CRITICAL, NORMAL, CONGRATS, ALERT, HEADER
+from crewai_sellers_flow.domain.message_renderer import Channel, day_of_week, find_template, render_crm, render_whatsapp
 
 class ReasonCancel(BaseModel):
     type: str
@@ -13,6 +13,15 @@ class ReasonCancel(BaseModel):
     quantity: int
 
 
+class ReasonsSummary(BaseModel):
+    """Resumo de todos os horários do motivo dominante, quando só os
+    primeiros ficam em reasons_cancel."""
+    total: int
+    slots: int
+    max_quantity: int
+    ties_at_max: int
+
+
 class CourrierCancel(BaseModel):
     email: str
     quantity: int
@@ -44,6 +53,49 @@ class SellerReport(BaseModel):
     message: Optional[str] = None
     stockout_top_product: Optional[str] = None
     reasons_cancel: list[ReasonCancel]
+    reasons_summary: Optional[ReasonsSummary] = None
+    courriers_cancel: list[CourrierCancel] = []
+
+    # Métricas derivadas dos contadores (fill rate, status, ofensor...),
+    # calculadas uma única vez e descartadas quando algum contador muda
+    _metrics: dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    # Política de status aplicada ao relatório (ver status_policy); None usa a regra da classe
+    _policy: Any = PrivateAttr(default=None)
+
+    _COUNTERS: ClassVar[frozenset[str]] = frozenset({
+        "orders_managed",
+        "canceled_by_seller",
+        "canceled_by_consumer",
+        "canceled_on_delivery",
+        "expired",
+        "rejected",
+    })
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self._COUNTERS:
+            self._metrics.clear()
+
+    # As cópias (copy.copy, copy.deepcopy e model_copy, que usa os dois)
+    # ganham um cache próprio: compartilhado, um contador alterado na cópia
+    # limparia as métricas do original, e model_copy(update=...) não passa
+    # pelo __setattr__
+    def __copy__(self):
+        copy = super().__copy__()
+        copy._metrics = {}
+        return copy
+
+    def __deepcopy__(self, memo: dict[int, Any] | None = None):
+        copy = super().__deepcopy__(memo)
+        copy._metrics = {}
+        return copy
+
+    def _cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        metrics = self._metrics
+        if name not in metrics:
+            metrics[name] = compute()
+        return metrics[name]
 
     def total_canceled(self) -> int:
         return (
@@ -55,6 +107,9 @@ class SellerReport(BaseModel):
         )
 
     def _fill_rate(self) -> float:
+        return self._cached("fill_rate", self._compute_fill_rate)
+
+    def _compute_fill_rate(self) -> float:
         canceled = self.total_canceled()
         if self.orders_managed == 0:
             return 0
@@ -64,10 +119,52 @@ class SellerReport(BaseModel):
         return float(rate.quantize(Decimal("0.1"), rounding=ROUND_UP))
 
     def rate_canceled_on_delivery(self) -> float:
+        return self._cached("rate_canceled_on_delivery", self._compute_rate_canceled_on_delivery)
+
+    def _compute_rate_canceled_on_delivery(self) -> float:
         rate = Decimal(self.canceled_on_delivery) / Decimal(self.orders_managed) * 100
         return float(rate.quantize(Decimal('0.1'), rounding=ROUND_UP))
 
+    @staticmethod
+    def set_classifications(
+        reports: Iterable["SellerReport"], fill_rates: Iterable[float], statuses: Iterable[SellerStatus]
+    ) -> None:
+        """Grava fill rate e status já calculados fora dos relatórios (como no
+        SellerReportBatch.classify), que passam a ser os valores em cache.
+
+        Escreve direto nos campos e no cache de métricas, sem passar pelo
+        __setattr__ de cada campo: com muitos relatórios ele custaria mais do
+        que o próprio cálculo vetorizado.
+        """
+        for report, fill_rate, status in zip(reports, fill_rates, statuses):
+            fields = report.__dict__
+            fields["fill_rate"] = fill_rate
+            fields["status"] = status
+            report.__pydantic_fields_set__.update(("fill_rate", "status"))
+            metrics = report.__pydantic_private__["_metrics"]
+            metrics["fill_rate"] = fill_rate
+            metrics["status"] = status
+
+    def status_rule(self) -> type["SellerReport"]:
+        """Classe cuja regra de status vale para o relatório: a da política
+        aplicada (ver status_policy) ou a do próprio relatório."""
+        return self._policy.report_type if self._policy is not None else type(self)
+
+    def apply_policy(self, policy) -> "SellerReport":
+        """Troca a regra de status do relatório sem copiá-lo."""
+        self._policy = policy
+        self._metrics.pop("status", None)
+        self._metrics.pop("offender", None)
+        return self
+
     def _status(self) -> SellerStatus:
+        """Status do vendedor, calculado uma vez pela política aplicada ou
+        pela regra da classe (`_compute_status`)."""
+        if self._policy is not None:
+            return self._cached("status", lambda: self._policy.status(self))
+        return self._cached("status", self._compute_status)
+
+    def _compute_status(self) -> SellerStatus:
         """Calcula o status do vendedor com base na taxa de preenchimento.
         
         Returns:
@@ -96,6 +193,9 @@ class SellerReport(BaseModel):
         Returns:
             Offender: O tipo de ofensor com maior número de cancelamentos
         """
+        return self._cached("offender", self._compute_offender)
+
+    def _compute_offender(self) -> Offender | None:
         if self._status() == SellerStatus.CONGRATS:
             return None
 
@@ -110,59 +210,14 @@ class SellerReport(BaseModel):
         return max(offenders.items(), key=lambda x: x[1])[0]
 
     def message_to_seller_to_whatsapp(self) -> str:
-        reasons = self.reasons_cancel
-        if len(reasons) > 0:
-            if template := self._get_template(reasons[0]):
-                template = f"{HEADER.get(self.status.value, '')}\n\n{template}\n\n"
-                template = template.format(
-                    FILL_RATE_CANCELED_ON_DELIVERY=f"{self.rate_canceled_on_delivery():.2f}%",
-                    FILL_RATE_INDEX=f"{self.fill_rate:.2f}%",
-                    STOCKOUT_TOP_PRODUCT=(
-                        f"\n\nO produto de maior impacto nos seus cancelamentos essa semana foi: {self.stockout_top_product}"
-                        if self.stockout_top_product
-                        else ""
-                    ),
-                )
-                reasons = [reason for reason in self.reasons_cancel if reason.quantity >= 2]
-                if len(reasons) > 0 and self.status != SellerStatus.CONGRATS:
-                    cancel = f"{self._get_day_of_week(reasons[0].date)} às {reasons[0].hour:02d}h"
-                    for item in range(1, len(reasons)):
-                        if reasons[0].quantity == reasons[item].quantity:
-                            cancel += f" e {self._get_day_of_week(reasons[item].date)} às {reasons[item].hour:02d}h"
-                    template += f"*Atenção {cancel}.*\nCancelamento é FALTA GRAVE.\n\n"
-                template += "Equipe Zé Delivery"
-                return template
-        return ""
+        return render_whatsapp(self)
 
     def _get_day_of_week(self, date: date) -> str:
-        day = date.strftime("%A")
-        day_mapping = {
-            "Monday": "à Segunda-feira",
-            "Tuesday": "à Terça-feira", 
-            "Wednesday": "à Quarta-feira",
-            "Thursday": "à Quinta-feira",
-            "Friday": "à Sexta-feira",
-            "Saturday": "ao Sábado",
-            "Sunday": "ao Domingo"
-        }
-        return day_mapping.get(day, day)
+        return day_of_week(date)
 
     def _get_template(self, reason: ReasonCancel) -> str:
-        template = ""
-        if self.status == SellerStatus.CRITICAL:
-            template = CRITICAL
-        elif self.status == SellerStatus.ALERT:
-            template = ALERT
-        elif self.status == SellerStatus.CONGRATS:
-            template = CONGRATS
-        elif self.status == SellerStatus.NORMAL:
-            template = NORMAL
-
-        if isinstance(template, dict):
-            template = template.get(reason.type, "")
-            if isinstance(template, dict):
-                template = template.get(reason.reason, "")
-        return template
+        template = find_template(self.status, reason.type, reason.reason, Channel.CRM)
+        return template.text if template else ""
 
     def get_reason(self) -> str | None:
         """Retorna o motivo de cancelamento do vendedor.
@@ -200,21 +255,11 @@ class SellerReport(BaseModel):
         Returns:
             str | None: A mensagem para o vendedor ou None se o vendedor não tem uma mensagem para enviar
         """
-        if self._status() != SellerStatus.CONGRATS:
-            reasons = self.reasons_cancel
-            if len(reasons) > 0:
-                reasons = [reason for reason in self.reasons_cancel if reason.quantity >= 2]
-                if len(reasons) > 0:
-                    cancel = f"{self._get_day_of_week(reasons[0].date)} as {reasons[0].hour:02d}h"
-                    for item in range(1, len(reasons)):
-                        if reasons[0].quantity == reasons[item].quantity:
-                            cancel += f" e {self._get_day_of_week(reasons[item].date)} as {reasons[item].hour:02d}h"
-                    return f"Atenção {cancel}. Cancelamento é FALTA GRAVE."
-        return None
+        return render_crm(self)
 
 class SellerReportNewTarget(SellerReport):
     
-    def _status(self) -> SellerStatus:
+    def _compute_status(self) -> SellerStatus:
         """Calcula o status do vendedor com base na taxa de preenchimento.
         
         Returns:
@@ -0,0 +1,334 @@
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from crewai_sellers_flow.domain.message_renderer import render_crm, render_whatsapp
+from crewai_sellers_flow.domain.seller_report import (
+    Offender,
+    ReasonCancel,
+    ReasonsSummary,
+    CourrierCancel,
+    SellerReport,
+    SellerReportNewTarget,
+    SellerStatus,
+)
+
+# Ordem dos códigos de status e de ofensor nos arrays do lote
+STATUSES = [SellerStatus.CRITICAL, SellerStatus.ALERT, SellerStatus.NORMAL, SellerStatus.CONGRATS]
+CRITICAL, ALERT, NORMAL, CONGRATS = range(len(STATUSES))
+
+# Mesma ordem de desempate do SellerReport.offender (o primeiro maior vence)
+OFFENDERS = [Offender.SELLER, Offender.CONSUMER, Offender.DELIVERY, Offender.REJECTED, Offender.EXPIRED]
+NO_OFFENDER = -1
+
+COUNTERS = [
+    "orders_managed",
+    "canceled_by_seller",
+    "canceled_by_consumer",
+    "canceled_on_delivery",
+    "expired",
+    "rejected",
+]
+
+
+def _tenths_round_up(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Percentual numerator/denominator em décimos, arredondado com ROUND_UP
+    (afastando de zero), como o `Decimal.quantize` do SellerReport. Onde o
+    denominador é zero o resultado é 0."""
+    numerator = numerator * 1000
+    safe = np.where(denominator == 0, 1, denominator)
+    tenths = np.sign(numerator) * (-(-np.abs(numerator) // safe))
+    return np.where(denominator == 0, 0, tenths)
+
+
+def _default_status(orders: np.ndarray, fill_rate_tenths: np.ndarray) -> np.ndarray:
+    # Regras do SellerReport._compute_status
+    status = np.select(
+        [fill_rate_tenths > 940, fill_rate_tenths >= 920, fill_rate_tenths > 900],
+        [CONGRATS, NORMAL, ALERT],
+        default=CRITICAL,
+    )
+    return np.where(orders == 0, NORMAL, status)
+
+
+def _new_target_status(orders: np.ndarray, fill_rate_tenths: np.ndarray) -> np.ndarray:
+    # Regras do SellerReportNewTarget._compute_status
+    status = np.where(fill_rate_tenths >= 940, CONGRATS, CRITICAL)
+    return np.where(orders == 0, CRITICAL, status)
+
+
+# Regra de status vetorizada de cada tipo de relatório
+STATUS_RULES = {
+    SellerReport: _default_status,
+    SellerReportNewTarget: _new_target_status,
+}
+
+
+class SellerReportBatch:
+    """Relatórios de muitos vendedores guardados em colunas (struct-of-arrays).
+
+    Os contadores ficam em arrays NumPy int64, um por campo, e fill rate, taxa
+    de cancelamento na entrega, status e ofensor são calculados para o lote
+    inteiro de uma vez, com as mesmas regras (e o mesmo arredondamento) do
+    SellerReport. A regra de status é a de `report_type`: uma classe de
+    relatório para o lote inteiro ou uma por vendedor (como em `from_reports`,
+    que usa a política aplicada a cada relatório).
+
+    Cada vendedor pode ser acessado por uma view leve, que só lê as posições
+    do lote e pode ser usada no lugar de um SellerReport (por exemplo, no
+    message_renderer), ou convertido em SellerReport com `to_report`. Com
+    `classify` os valores do lote são gravados nos relatórios de origem.
+    """
+
+    def __init__(
+        self,
+        seller_id: Iterable[int],
+        orders_managed: Iterable[int],
+        canceled_by_seller: Iterable[int],
+        canceled_by_consumer: Iterable[int],
+        canceled_on_delivery: Iterable[int],
+        expired: Iterable[int],
+        rejected: Iterable[int],
+        reasons_cancel: list[list[ReasonCancel]] | None = None,
+        courriers_cancel: list[list[CourrierCancel]] | None = None,
+        reasons_summary: list[ReasonsSummary | None] | None = None,
+        stockout_top_product: list[str | None] | None = None,
+        report_type: type[SellerReport] | list[type[SellerReport]] = SellerReport,
+    ):
+        self.seller_id = np.asarray(seller_id, dtype=np.int64)
+        self.orders_managed = np.asarray(orders_managed, dtype=np.int64)
+        self.canceled_by_seller = np.asarray(canceled_by_seller, dtype=np.int64)
+        self.canceled_by_consumer = np.asarray(canceled_by_consumer, dtype=np.int64)
+        self.canceled_on_delivery = np.asarray(canceled_on_delivery, dtype=np.int64)
+        self.expired = np.asarray(expired, dtype=np.int64)
+        self.rejected = np.asarray(rejected, dtype=np.int64)
+        self.reasons_cancel = reasons_cancel
+        self.courriers_cancel = courriers_cancel
+        self.reasons_summary = reasons_summary
+        self.stockout_top_product = stockout_top_product
+        # Com regras diferentes entre os vendedores, report_type fica None e
+        # row_rules guarda o índice (em rule_types) da regra de cada um
+        self.report_type: type[SellerReport] | None = None
+        self.rule_types: list[type[SellerReport]] = []
+        self.row_rules: np.ndarray | None = None
+        if isinstance(report_type, type):
+            self.report_type = report_type
+        else:
+            rule_index = {}
+            rows = [rule_index.setdefault(rule, len(rule_index)) for rule in report_type]
+            self.rule_types = list(rule_index)
+            if len(self.rule_types) > 1:
+                self.row_rules = np.asarray(rows, dtype=np.int64)
+            else:
+                self.report_type = self.rule_types[0] if self.rule_types else SellerReport
+        self._metrics: dict = {}
+
+    @classmethod
+    def from_reports(
+        cls, reports: list[SellerReport], report_type: type[SellerReport] | None = None
+    ) -> "SellerReportBatch":
+        """Monta o lote a partir dos relatórios. Sem `report_type`, cada
+        vendedor usa a regra do seu relatório (a da política aplicada com
+        `apply_policy` ou a da classe)."""
+        columns = {
+            name: [getattr(report, name) for report in reports]
+            for name in ["seller_id", *COUNTERS, "reasons_cancel", "courriers_cancel", "reasons_summary", "stockout_top_product"]
+        }
+        if report_type is None:
+            report_type = [report.status_rule() for report in reports]
+        return cls(**columns, report_type=report_type)
+
+    def rule_for(self, index: int) -> type[SellerReport]:
+        """Classe cuja regra de status vale para o vendedor na posição `index`."""
+        if self.row_rules is None:
+            return self.report_type
+        return self.rule_types[self.row_rules[index]]
+
+    def __len__(self) -> int:
+        return len(self.seller_id)
+
+    def __getitem__(self, index: int) -> "SellerReportView":
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return SellerReportView(self, index % len(self))
+
+    def __iter__(self) -> Iterator["SellerReportView"]:
+        return (SellerReportView(self, index) for index in range(len(self)))
+
+    def _cached(self, name: str, compute):
+        if name not in self._metrics:
+            self._metrics[name] = compute()
+        return self._metrics[name]
+
+    def total_canceled(self) -> np.ndarray:
+        return self._cached(
+            "total_canceled",
+            lambda: self.canceled_by_seller
+            + self.canceled_by_consumer
+            + self.canceled_on_delivery
+            + self.expired
+            + self.rejected,
+        )
+
+    def fill_rate_tenths(self) -> np.ndarray:
+        """Fill rate de cada vendedor em décimos de ponto percentual (inteiros)."""
+        return self._cached(
+            "fill_rate_tenths",
+            lambda: _tenths_round_up(self.orders_managed - self.total_canceled(), self.orders_managed),
+        )
+
+    def fill_rate(self) -> np.ndarray:
+        return self._cached("fill_rate", lambda: self.fill_rate_tenths() / 10)
+
+    def rate_canceled_on_delivery(self) -> np.ndarray:
+        """Taxa de cancelamento na entrega; NaN para quem não tem pedidos."""
+        return self._cached(
+            "rate_canceled_on_delivery",
+            lambda: np.where(
+                self.orders_managed == 0,
+                np.nan,
+                _tenths_round_up(self.canceled_on_delivery, self.orders_managed) / 10,
+            ),
+        )
+
+    def status_codes(self, report_type: type[SellerReport] | None = None) -> np.ndarray:
+        """Código do status de cada vendedor (índice em STATUSES) pela regra de
+        `report_type` (por padrão, a do lote ou a de cada vendedor)."""
+        report_type = report_type or self.report_type
+        if report_type is None:
+            return self._cached(("status", None), self._row_status_codes)
+        return self._cached(
+            ("status", report_type),
+            lambda: STATUS_RULES[report_type](self.orders_managed, self.fill_rate_tenths()),
+        )
+
+    def _row_status_codes(self) -> np.ndarray:
+        codes = np.empty(len(self), dtype=np.int64)
+        for rule, report_type in enumerate(self.rule_types):
+            mask = self.row_rules == rule
+            codes[mask] = self.status_codes(report_type)[mask]
+        return codes
+
+    def offender_codes(self, report_type: type[SellerReport] | None = None) -> np.ndarray:
+        """Código do maior ofensor de cada vendedor (índice em OFFENDERS),
+        ou NO_OFFENDER para quem está com status de Congrats."""
+        report_type = report_type or self.report_type
+
+        def compute():
+            counters = np.stack([
+                self.canceled_by_seller,
+                self.canceled_by_consumer,
+                self.canceled_on_delivery,
+                self.rejected,
+                self.expired,
+            ], axis=1)
+            offenders = counters.argmax(axis=1) if len(self) else np.empty(0, dtype=np.int64)
+            return np.where(self.status_codes(report_type) == CONGRATS, NO_OFFENDER, offenders)
+
+        return self._cached(("offender", report_type), compute)
+
+    def statuses(self, report_type: type[SellerReport] | None = None) -> list[SellerStatus]:
+        return [STATUSES[code] for code in self.status_codes(report_type).tolist()]
+
+    def offenders(self, report_type: type[SellerReport] | None = None) -> list[Offender | None]:
+        return [
+            None if code == NO_OFFENDER else OFFENDERS[code]
+            for code in self.offender_codes(report_type).tolist()
+        ]
+
+    def to_reports(self, report_type: type[SellerReport] | None = None) -> list[SellerReport]:
+        """Materializa os relatórios do lote, com fill rate e status preenchidos."""
+        return [view.to_report(report_type) for view in self]
+
+    def classify(self, reports: list[SellerReport], status_codes: np.ndarray | None = None) -> list[SellerReport]:
+        """Grava fill rate e status do lote nos relatórios que o originaram (na
+        mesma ordem), sem que cada relatório os recalcule.
+
+        `status_codes` permite usar outra regra de status, como a de um
+        CohortPolicies; por padrão é a regra do lote.
+        """
+        status_codes = self.status_codes() if status_codes is None else status_codes
+        fill_rates = self.fill_rate().tolist()
+        # Como no SellerReport._fill_rate, quem não tem pedidos fica com 0 inteiro
+        for index in np.flatnonzero(self.orders_managed == 0).tolist():
+            fill_rates[index] = 0
+        SellerReport.set_classifications(reports, fill_rates, [STATUSES[code] for code in status_codes.tolist()])
+        return reports
+
+
+class SellerReportView:
+    """View de um vendedor dentro de um SellerReportBatch, sem copiar os dados."""
+
+    __slots__ = ("batch", "index")
+
+    def __init__(self, batch: SellerReportBatch, index: int):
+        self.batch = batch
+        self.index = index
+
+    def __getattr__(self, name: str):
+        if name in COUNTERS or name == "seller_id":
+            return int(getattr(self.batch, name)[self.index])
+        raise AttributeError(name)
+
+    @property
+    def reasons_cancel(self) -> list[ReasonCancel]:
+        reasons = self.batch.reasons_cancel
+        return reasons[self.index] if reasons is not None else []
+
+    @property
+    def courriers_cancel(self) -> list[CourrierCancel]:
+        courriers = self.batch.courriers_cancel
+        return courriers[self.index] if courriers is not None else []
+
+    @property
+    def reasons_summary(self) -> ReasonsSummary | None:
+        summaries = self.batch.reasons_summary
+        return summaries[self.index] if summaries is not None else None
+
+    @property
+    def stockout_top_product(self) -> str | None:
+        products = self.batch.stockout_top_product
+        return products[self.index] if products is not None else None
+
+    @property
+    def fill_rate(self) -> float:
+        return float(self.batch.fill_rate()[self.index])
+
+    def _fill_rate(self) -> float:
+        return self.fill_rate
+
+    def rate_canceled_on_delivery(self) -> float:
+        """Taxa de cancelamento na entrega; NaN para quem não tem pedidos."""
+        return float(self.batch.rate_canceled_on_delivery()[self.index])
+
+    @property
+    def status(self) -> SellerStatus:
+        """Status pela regra do lote, como o campo `status` do SellerReport."""
+        return self._status()
+
+    def _status(self, report_type: type[SellerReport] | None = None) -> SellerStatus:
+        return STATUSES[self.batch.status_codes(report_type)[self.index]]
+
+    def offender(self, report_type: type[SellerReport] | None = None) -> Offender | None:
+        code = self.batch.offender_codes(report_type)[self.index]
+        return None if code == NO_OFFENDER else OFFENDERS[code]
+
+    def message_to_seller_to_whatsapp(self) -> str:
+        return render_whatsapp(self)
+
+    def message_to_seller(self) -> str | None:
+        return render_crm(self)
+
+    def to_report(self, report_type: type[SellerReport] | None = None) -> SellerReport:
+        report_type = report_type or self.batch.rule_for(self.index)
+        report = report_type(
+            seller_id=self.seller_id,
+            **{name: getattr(self, name) for name in COUNTERS},
+            reasons_cancel=self.reasons_cancel,
+            reasons_summary=self.reasons_summary,
+            stockout_top_product=self.stockout_top_product,
+            courriers_cancel=self.courriers_cancel,
+        )
+        report.fill_rate = self.fill_rate
+        report.status = self._status(report_type)
+        return report
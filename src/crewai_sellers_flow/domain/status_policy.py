@@ -0,0 +1,75 @@
+from typing import Iterable
+
+import numpy as np
+
+from crewai_sellers_flow.domain.seller_report import SellerReport, SellerReportNewTarget, SellerStatus
+from crewai_sellers_flow.domain.seller_report_batch import SellerReportBatch
+from crewai_sellers_flow.domain.sellers_new_target import SELLERS_NEW_TARGET
+
+
+class StatusPolicy:
+    """Regra de status aplicada a um relatório já existente, sem copiá-lo.
+
+    Usa a regra (`_compute_status`) de uma classe de relatório, como
+    SellerReportNewTarget, sobre qualquer SellerReport, e a versão vetorizada
+    da mesma regra sobre um SellerReportBatch. Como o status define o
+    template, a política também define a mensagem do vendedor.
+    """
+
+    def __init__(self, name: str, report_type: type[SellerReport]):
+        self.name = name
+        self.report_type = report_type
+
+    def status(self, report: SellerReport) -> SellerStatus:
+        return self.report_type._compute_status(report)
+
+    def status_codes(self, batch: SellerReportBatch) -> np.ndarray:
+        return batch.status_codes(self.report_type)
+
+    def __repr__(self) -> str:
+        return f"StatusPolicy({self.name!r})"
+
+
+DEFAULT_POLICY = StatusPolicy("DEFAULT", SellerReport)
+NEW_TARGET_POLICY = StatusPolicy("NEW_TARGET", SellerReportNewTarget)
+
+
+class CohortPolicies:
+    """Escolhe a política de status de cada vendedor pelo seu ID.
+
+    Os IDs de todas as coortes ficam em um único dict, então a escolha custa
+    uma consulta por vendedor. Vendedores fora das coortes usam `default`.
+    """
+
+    def __init__(self, cohorts: dict[StatusPolicy, Iterable[int]], default: StatusPolicy = DEFAULT_POLICY):
+        self.default = default
+        self.cohorts = {policy: np.unique(np.asarray(list(ids), dtype=np.int64)) for policy, ids in cohorts.items()}
+        self._by_seller = {
+            int(seller_id): policy for policy, ids in self.cohorts.items() for seller_id in ids
+        }
+
+    def policy_for(self, seller_id: int) -> StatusPolicy:
+        return self._by_seller.get(seller_id, self.default)
+
+    def in_cohort(self, seller_id: int, policy: StatusPolicy) -> bool:
+        return self._by_seller.get(seller_id) is policy
+
+    def apply(self, reports: Iterable[SellerReport]) -> None:
+        """Aplica a política de cada vendedor aos relatórios, sem copiá-los."""
+        for report in reports:
+            report.apply_policy(self.policy_for(report.seller_id))
+
+    def status_codes(self, batch: SellerReportBatch) -> np.ndarray:
+        """Código do status de cada vendedor do lote pela política da sua coorte."""
+        codes = self.default.status_codes(batch)
+        for policy, ids in self.cohorts.items():
+            if policy is self.default:
+                continue
+            mask = np.isin(batch.seller_id, ids)
+            if mask.any():
+                codes = np.where(mask, policy.status_codes(batch), codes)
+        return codes
+
+
+# Vendedores da meta nova (SELLERS_NEW_TARGET) e os demais com a regra padrão
+SELLER_POLICIES = CohortPolicies({NEW_TARGET_POLICY: SELLERS_NEW_TARGET})
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
+from crewai_sellers_flow.domain.seller_report import SellerReport
 
 
 class SellerRepository(ABC):
@@ -7,3 +9,8 @@ class SellerRepository(ABC):
     @abstractmethod
     def get_sellers(self) -> list[dict]:
         pass
+
+    @abstractmethod
+    def get_sellers_many(self, windows: list[tuple[datetime, datetime]]) -> list[list[SellerReport]]:
+        """Obtém os vendedores de várias janelas de datas, carregando cada dia uma única vez."""
+        pass
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Iterable
 from crewai_sellers_flow.domain.seller_stockout import SellerStockOut
+from crewai_sellers_flow.domain.seller_report import SellerReport
 
 
 class SellerStockOutRepository(ABC):
@@ -10,4 +11,17 @@ class SellerStockOutRepository(ABC):
     def read(self) -> list[SellerStockOut]:
         pass
 
+    @abstractmethod
+    def get(self, seller_id: int) -> SellerStockOut | None:
+        """Retorna o stockout do seller pelo ID, ou None se não houver."""
+        pass
+
+    def join(self, sellers: Iterable[SellerReport]) -> Iterable[SellerReport]:
+        """Preenche o produto de maior stockout de cada relatório, com uma
+        consulta por seller."""
+        for seller in sellers:
+            stockout = self.get(seller.seller_id)
+            seller.stockout_top_product = stockout.top_product if stockout else None
+        return sellers
+
 
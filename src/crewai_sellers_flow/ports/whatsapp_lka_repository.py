@@ -1,6 +1,16 @@
 from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Iterable, Optional
 from pydantic import BaseModel
 
+
+class LKAStatus(Enum):
+    RESOLVED = "RESOLVED"
+    POC_NOT_FOUND = "POC_NOT_FOUND"
+    LKA_PHONE_UNKNOWN = "LKA_PHONE_UNKNOWN"
+    WEEKLY_OPT_OUT = "WEEKLY_OPT_OUT"
+
+
 class WhatsappLKARepository(ABC):
     """Interface para o repositório de LKA dos sellers."""
 
@@ -8,6 +18,18 @@ class WhatsappLKARepository(ABC):
         instance: str
         token: str
 
+    class Resolution(BaseModel):
+        """Resultado da busca do LKA de um seller; `lka` só existe quando RESOLVED."""
+        seller_id: int
+        status: LKAStatus
+        lka: Optional["WhatsappLKARepository.Output"] = None
+        error: Optional[str] = None
+
     @abstractmethod
     def get_lka(self, seller_id: str) -> Output:
         pass
+
+    @abstractmethod
+    def get_lka_many(self, seller_ids: Iterable[int]) -> dict[int, Resolution]:
+        """Busca o LKA de vários sellers de uma vez, sem lançar exceções por seller."""
+        pass
@@ -6,14 +6,18 @@ import traceback
 from datetime import datetime
 from crewai_sellers_flow.adapters.braze_crm_plataform import BrazeCRMPlatform
 from crewai_sellers_flow.config import config
+from crewai_sellers_flow.adapters.seller_report_writer import SellerReportWriter
 from crewai_sellers_flow.adapters.whatsapp_lka_sharepoint import WhatsappLKASharepoint
-from crewai_sellers_flow.adapters.api_z_message import ApiZMessage
+from crewai_sellers_flow.adapters.api_z_message import ApiZMessage, PreparedImage
+from crewai_sellers_flow.adapters.dispatch_scheduler import DispatchScheduler, InstanceRateLimiter
+from crewai_sellers_flow.ports.whatsapp_lka_repository import LKAStatus
 import base64
 import concurrent.futures
 import time
 from typing import List, Dict, Any
 from crewai_sellers_flow.domain.seller_report import SellerReport, SellerStatus
-from crewai_sellers_flow.domain.sellers_new_target import SELLERS_NEW_TARGET
+from crewai_sellers_flow.domain.status_policy import NEW_TARGET_POLICY, SELLER_POLICIES
+from crewai_sellers_flow.domain.message_renderer import Channel, render_messages
 from crewai_sellers_flow.adapters.csv_seller_stockout_repository import CsvSellerStockOutRepository
 
 # General JSON content search
@@ -28,12 +32,13 @@ def convert_to_base64(file_path: str):
 
 def process_seller(
     seller: SellerReport,
-    sharepoint: WhatsappLKASharepoint,
+    lka: WhatsappLKASharepoint.LKA,
     api_z_message: ApiZMessage,
-    base64_images: Dict[str, str],
+    base64_images: Dict[str, PreparedImage],
 ) -> Dict[str, Any]:
     """
     Processa um seller individualmente e retorna o resultado.
+    O LKA do seller já vem resolvido (veja `get_lka_many`).
     """
     result = {
         "seller_id": seller.seller_id,
@@ -43,8 +48,6 @@ def process_seller(
     }
 
     try:
-        lka = sharepoint.get_lka(seller.seller_id)
-
         if seller.status != SellerStatus.CONGRATS:
             if len(seller.reasons_cancel) == 0:
                 result["error"] = "No reasons to cancel"
@@ -68,12 +71,10 @@ def process_seller(
         else:
             base64_image = base64_images["base64_parabens"]
 
-        seller.message = seller.message_to_seller_to_whatsapp()
-
         # Envia a imagem
         image_response = api_z_message.send_image(
             lka.phone_seller,
-            f"data:image/png;base64,{base64_image}",
+            base64_image,
             lka.instance,
             lka.token
         )
@@ -118,10 +119,9 @@ if __name__ == "__main__":
     end_date = datetime(2025, 10, 19)
     sellers = repository.get_sellers(start_date, end_date)
     stockout = CsvSellerStockOutRepository()
-    stockout_sellers = stockout.read()
-    for seller in sellers:
-        seller.stockout_top_product = next((s.top_product for s in stockout_sellers if s.id == seller.seller_id), None)
-        seller.message = seller.message_to_seller_to_whatsapp()
+    stockout.join(sellers)
+    for seller, messages in zip(sellers, render_messages(sellers, [Channel.WHATSAPP])):
+        seller.message = messages.whatsapp
 
     # sellers = [
     #     seller
@@ -146,24 +146,24 @@ if __name__ == "__main__":
     #         # print(f"Traceback completo:")
     #         # print(traceback.format_exc())
 
-    json_strings = [seller.model_dump_json(indent=4) for seller in sellers]
-    combined_json = f"[{','.join(json_strings)}]"
-    with open("resultado.json", 'w', encoding='utf-8') as f:
-        f.write(combined_json)
+    with SellerReportWriter(config.SELLERS_REPORT_PATH) as writer:
+        writer.write_all(sellers)
 
     # print(f"Total de vendedores: {total_sellers}")
     # print(f"Total de LKA não encontrados: {total_lka_not_found}")
 
-    api_z_message = ApiZMessage()
-
-    # Prepara as imagens base64 em um dicionário para facilitar o acesso
+    # Prepara as imagens base64 em um dicionário para facilitar o acesso, com o
+    # corpo JSON de envio de cada imagem serializado uma única vez
     base64_images = {
-        "base64_parabens": base64_parabens,
-        "base64_consumidor": base64_consumidor,
-        "base64_expirado": base64_expirado,
-        "base64_motoca": base64_motoca,
-        "base64_rejeitado": base64_rejeitado,
-        "base64_loja": base64_loja
+        name: ApiZMessage.prepare_image(f"data:image/png;base64,{image}")
+        for name, image in {
+            "base64_parabens": base64_parabens,
+            "base64_consumidor": base64_consumidor,
+            "base64_expirado": base64_expirado,
+            "base64_motoca": base64_motoca,
+            "base64_rejeitado": base64_rejeitado,
+            "base64_loja": base64_loja
+        }.items()
     }
 
     # Filtra sellers que precisam de mensagem
@@ -171,23 +171,50 @@ if __name__ == "__main__":
         seller
         for seller in sellers
         if (seller.seller_id < 82354 or seller.seller_id == 85452)
-        and seller.seller_id not in SELLERS_NEW_TARGET
+        and not SELLER_POLICIES.in_cohort(seller.seller_id, NEW_TARGET_POLICY)
         if seller.have_message_to_seller()
     ]
 
-    print(f"🚀 Iniciando processamento paralelo de {len(sellers_to_process)} vendedores...")
     start_time = time.time()
 
-    # Processamento paralelo
+    # Resolve o LKA de todos os sellers de uma vez; quem não tem LKA válido
+    # (POC não encontrado, fone desconhecido ou desabilitado) já sai como falha
+    resolutions = sharepoint.get_lka_many(seller.seller_id for seller in sellers_to_process)
     results = []
-    max_workers = 15  # Ajuste conforme necessário (recomendo 5-15 para APIs externas)
+    for status in LKAStatus:
+        if status == LKAStatus.RESOLVED:
+            continue
+        unresolved = [resolution for resolution in resolutions.values() if resolution.status == status]
+        if unresolved:
+            print(f"❌ {len(unresolved)} vendedores sem LKA ({status.value})")
+        results.extend(
+            {"seller_id": resolution.seller_id, "success": False, "error": resolution.error, "responses": []}
+            for resolution in unresolved
+        )
+    sellers_to_process = [
+        seller for seller in sellers_to_process
+        if resolutions[seller.seller_id].status == LKAStatus.RESOLVED
+    ]
+
+    # Uma fila por instância de LKA, cada uma no ritmo do seu balde de tokens;
+    # o total de threads (e de conexões) cresce com o número de instâncias
+    scheduler = DispatchScheduler()
+    instances = {resolutions[seller.seller_id].lka.instance for seller in sellers_to_process}
+    api_z_message = ApiZMessage(
+        pool_size=max(len(instances) * scheduler.workers_per_instance, 1),
+        rate_limiter=InstanceRateLimiter(),
+    )
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submete todas as tarefas
-        future_to_seller = {
-            executor.submit(process_seller, seller, sharepoint, api_z_message, base64_images): seller 
-            for seller in sellers_to_process
-        }
+    print(f"🚀 Iniciando processamento paralelo de {len(sellers_to_process)} vendedores em {len(instances)} instâncias...")
+
+    # Processamento paralelo
+    with scheduler:
+        # Submete todas as tarefas na fila da instância do LKA de cada vendedor
+        future_to_seller = {}
+        for seller in sellers_to_process:
+            lka = resolutions[seller.seller_id].lka
+            future = scheduler.submit(lka.instance, process_seller, seller, lka, api_z_message, base64_images)
+            future_to_seller[future] = seller
 
         # Coleta os resultados conforme são concluídos
         for future in concurrent.futures.as_completed(future_to_seller):
@@ -203,6 +230,7 @@ if __name__ == "__main__":
                     "error": str(e),
                     "responses": []
                 })
+    api_z_message.close()
 
     end_time = time.time()
     processing_time = end_time - start_time